@@ -3,14 +3,16 @@ Opportunity Persistence Tracker
 Tracks arbitrage opportunities over time
 """
 
+import math
 import time
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
-from collections import defaultdict
+from collections import OrderedDict
+from functools import lru_cache
 import numpy as np
 
 
-@dataclass
+@dataclass(slots=True)
 class OpportunitySnapshot:
     """Single snapshot of an opportunity"""
     timestamp: float
@@ -20,48 +22,151 @@ class OpportunitySnapshot:
     liquidity: float
 
 
-@dataclass
+_INITIAL_SNAPSHOT_CAPACITY = 16
+
+
+@lru_cache(maxsize=4096)
+def _path_id(path: tuple) -> str:
+    """Opportunity ID for a cycle path (memoized per distinct path)"""
+    # Sort path to handle equivalent cycles
+    return "|".join(sorted(path[:-1]))  # Exclude closing token
+
+
+def _empty_column() -> np.ndarray:
+    # float32 is ample for returns/risk/confidence/liquidity scoring
+    return np.empty(_INITIAL_SNAPSHOT_CAPACITY, dtype=np.float32)
+
+
+def _empty_timestamps() -> np.ndarray:
+    # Epoch seconds need float64 precision
+    return np.empty(_INITIAL_SNAPSHOT_CAPACITY, dtype=np.float64)
+
+
+@dataclass(slots=True)
 class OpportunityLifecycle:
-    """Tracks lifecycle of single opportunity"""
+    """
+    Tracks lifecycle of single opportunity
+
+    Snapshots are stored column-wise (struct-of-arrays) in preallocated
+    NumPy buffers; only the first ``_n`` entries of each column are valid.
+    """
     opportunity_id: str
     path: List[str]
     first_seen: float
     last_seen: float
-    snapshots: List[OpportunitySnapshot] = field(default_factory=list)
     peak_return: float = 0.0
     peak_timestamp: float = 0.0
     alive_duration_ms: float = 0.0
     detection_count: int = 0
+    _ts: np.ndarray = field(default_factory=_empty_timestamps, init=False, repr=False)
+    _ret: np.ndarray = field(default_factory=_empty_column, init=False, repr=False)
+    _risk: np.ndarray = field(default_factory=_empty_column, init=False, repr=False)
+    _conf: np.ndarray = field(default_factory=_empty_column, init=False, repr=False)
+    _liq: np.ndarray = field(default_factory=_empty_column, init=False, repr=False)
+    _n: int = field(default=0, init=False, repr=False)
+    # Running return mean / sum of squared deviations (Welford)
+    _mean: float = field(default=0.0, init=False, repr=False)
+    _M2: float = field(default=0.0, init=False, repr=False)
+    # Memoized stats, valid while detection_count equals the *_at token
+    _score_cache: float = field(default=-1.0, init=False, repr=False)
+    _score_cache_at: int = field(default=-1, init=False, repr=False)
+    _decay_cache: str = field(default="", init=False, repr=False)
+    _decay_cache_at: int = field(default=-1, init=False, repr=False)
+    
+    @property
+    def snapshots(self) -> List[OpportunitySnapshot]:
+        """Materialize recorded snapshots (read-only view)"""
+        return [self.get_snapshot(i) for i in range(self._n)]
+    
+    def get_snapshot(self, i: int) -> OpportunitySnapshot:
+        """Build the i-th recorded snapshot from the columns"""
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("snapshot index out of range")
+        return OpportunitySnapshot(
+            timestamp=float(self._ts[i]),
+            return_pct=float(self._ret[i]),
+            risk_score=float(self._risk[i]),
+            confidence=float(self._conf[i]),
+            liquidity=float(self._liq[i])
+        )
+    
+    @property
+    def return_std(self) -> float:
+        """Population std of recorded returns (matches np.std)"""
+        return math.sqrt(self._M2 / self._n) if self._n > 1 else 0.0
+    
+    def _grow(self):
+        """Double snapshot column capacity"""
+        capacity = 2 * len(self._ts)
+        self._ts = np.resize(self._ts, capacity)
+        self._ret = np.resize(self._ret, capacity)
+        self._risk = np.resize(self._risk, capacity)
+        self._conf = np.resize(self._conf, capacity)
+        self._liq = np.resize(self._liq, capacity)
     
     def add_snapshot(self, snapshot: OpportunitySnapshot):
         """Add new snapshot"""
-        self.snapshots.append(snapshot)
-        self.last_seen = snapshot.timestamp
+        self.add_values(
+            snapshot.timestamp,
+            snapshot.return_pct,
+            snapshot.risk_score,
+            snapshot.confidence,
+            snapshot.liquidity
+        )
+    
+    def add_values(self,
+                   timestamp: float,
+                   return_pct: float,
+                   risk_score: float,
+                   confidence: float,
+                   liquidity: float):
+        """Record a snapshot straight into the columns"""
+        if self._n == len(self._ts):
+            self._grow()
+        
+        i = self._n
+        self._ts[i] = timestamp
+        self._ret[i] = return_pct
+        self._risk[i] = risk_score
+        self._conf[i] = confidence
+        self._liq[i] = liquidity
+        self._n = i + 1
+        
+        delta = return_pct - self._mean
+        self._mean += delta / self._n
+        self._M2 += delta * (return_pct - self._mean)
+        
+        self.last_seen = timestamp
         self.detection_count += 1
         
-        if snapshot.return_pct > self.peak_return:
-            self.peak_return = snapshot.return_pct
-            self.peak_timestamp = snapshot.timestamp
+        if return_pct > self.peak_return:
+            self.peak_return = return_pct
+            self.peak_timestamp = timestamp
         
         self.alive_duration_ms = (self.last_seen - self.first_seen) * 1000
     
     def get_decay_pattern(self) -> str:
         """Analyze how opportunity decayed"""
-        if len(self.snapshots) < 2:
-            return "insufficient_data"
-        
-        returns = [s.return_pct for s in self.snapshots]
+        if self._decay_cache_at == self.detection_count:
+            return self._decay_cache
         
-        # Check if monotonically decreasing
-        is_decreasing = all(returns[i] >= returns[i+1] for i in range(len(returns)-1))
-        is_increasing = all(returns[i] <= returns[i+1] for i in range(len(returns)-1))
-        
-        if is_decreasing:
-            return "monotonic_decay"
-        elif is_increasing:
-            return "improving"
+        if self._n < 2:
+            pattern = "insufficient_data"
         else:
-            return "oscillating"
+            d = np.diff(self._ret[:self._n])
+            
+            if (d <= 0).all():
+                pattern = "monotonic_decay"
+            elif (d >= 0).all():
+                pattern = "improving"
+            else:
+                pattern = "oscillating"
+        
+        self._decay_cache = pattern
+        self._decay_cache_at = self.detection_count
+        return pattern
     
     def get_persistence_score(self) -> float:
         """
@@ -73,6 +178,9 @@ class OpportunityLifecycle:
         
         Returns: 0-100
         """
+        if self._score_cache_at == self.detection_count:
+            return self._score_cache
+        
         # Frequency component (0-40 points)
         freq_score = min(self.detection_count * 4, 40)
         
@@ -80,17 +188,19 @@ class OpportunityLifecycle:
         duration_score = min(self.alive_duration_ms / 100, 40)  # 1 point per 100ms
         
         # Stability component (0-20 points)
-        if len(self.snapshots) >= 2:
-            returns = [s.return_pct for s in self.snapshots]
-            stability = 1 / (1 + np.std(returns))
+        if self._n >= 2:
+            stability = 1 / (1 + self.return_std)
             stability_score = stability * 20
         else:
             stability_score = 10
         
-        return min(freq_score + duration_score + stability_score, 100)
+        score = min(freq_score + duration_score + stability_score, 100)
+        self._score_cache = score
+        self._score_cache_at = self.detection_count
+        return score
 
 
-@dataclass
+@dataclass(slots=True)
 class PersistenceMetrics:
     """Aggregate persistence metrics"""
     total_opportunities: int
@@ -112,14 +222,25 @@ class PersistenceTracker:
     - Decay patterns
     """
     
-    def __init__(self, opportunity_timeout_ms: float = 10000):
+    def __init__(self, opportunity_timeout_ms: float = 10000, cleanup_interval: int = 256):
         """
         Args:
             opportunity_timeout_ms: Consider opportunity dead after this time
+            cleanup_interval: Sweep stale opportunities every N observations
         """
-        self.opportunities: Dict[str, OpportunityLifecycle] = {}
+        # Ordered by last_seen (oldest first): updated entries move to the end
+        self.opportunities: Dict[str, OpportunityLifecycle] = OrderedDict()
         self.timeout_ms = opportunity_timeout_ms
         self.start_time = time.time()
+        
+        # Running return stats across all tracked snapshots (Welford)
+        self._n = 0
+        self._mean = 0.0
+        self._M2 = 0.0
+        
+        # Stale sweeps are amortized over observations
+        self._clean_every = max(1, cleanup_interval)
+        self._obs_since_clean = 0
     
     def track_opportunity(self,
                          path: List[str],
@@ -138,34 +259,38 @@ class PersistenceTracker:
         
         current_time = time.time()
         
-        # Create snapshot
-        snapshot = OpportunitySnapshot(
-            timestamp=current_time,
-            return_pct=return_pct,
-            risk_score=risk_score,
-            confidence=confidence,
-            liquidity=liquidity
-        )
+        self._n += 1
+        delta = return_pct - self._mean
+        self._mean += delta / self._n
+        self._M2 += delta * (return_pct - self._mean)
         
-        if opp_id not in self.opportunities:
+        lifecycle = self.opportunities.get(opp_id)
+        if lifecycle is not None and (current_time - lifecycle.last_seen) * 1000 > self.timeout_ms * 2:
+            # Expired but not yet swept: sweep now so it restarts fresh
+            self._cleanup_stale()
+            lifecycle = None
+        
+        if lifecycle is None:
             # New opportunity
             lifecycle = OpportunityLifecycle(
                 opportunity_id=opp_id,
                 path=path,
                 first_seen=current_time,
                 last_seen=current_time,
-                snapshots=[snapshot],
                 peak_return=return_pct,
-                peak_timestamp=current_time,
-                detection_count=1
+                peak_timestamp=current_time
             )
+            lifecycle.add_values(current_time, return_pct, risk_score, confidence, liquidity)
             self.opportunities[opp_id] = lifecycle
         else:
             # Existing opportunity
-            self.opportunities[opp_id].add_snapshot(snapshot)
+            lifecycle.add_values(current_time, return_pct, risk_score, confidence, liquidity)
+            self.opportunities.move_to_end(opp_id)
         
         # Clean up stale opportunities
-        self._cleanup_stale()
+        self._obs_since_clean += 1
+        if self._obs_since_clean >= self._clean_every:
+            self._cleanup_stale()
         
         return opp_id
     
@@ -178,11 +303,15 @@ class PersistenceTracker:
         current_time = time.time()
         active = []
         
-        for lifecycle in self.opportunities.values():
+        # Walk from the most recently seen end until the first inactive one
+        for opp_id in reversed(self.opportunities):
+            lifecycle = self.opportunities[opp_id]
             age_ms = (current_time - lifecycle.last_seen) * 1000
-            if age_ms < self.timeout_ms:
-                active.append(lifecycle)
+            if age_ms >= self.timeout_ms:
+                break
+            active.append(lifecycle)
         
+        active.reverse()
         return active
     
     def get_persistence_metrics(self) -> PersistenceMetrics:
@@ -199,31 +328,26 @@ class PersistenceTracker:
             )
         
         lifecycles = list(self.opportunities.values())
+        n = len(lifecycles)
         
         # Lifespan stats
-        lifespans = [lc.alive_duration_ms for lc in lifecycles]
-        avg_lifespan = np.mean(lifespans)
+        lifespans = np.fromiter((lc.alive_duration_ms for lc in lifecycles), dtype=np.float64, count=n)
+        avg_lifespan = lifespans.mean()
         median_lifespan = np.median(lifespans)
         
         # Detection count
-        avg_detection_count = np.mean([lc.detection_count for lc in lifecycles])
-        
-        # Most persistent
-        persistence_scores = [(lc.get_persistence_score(), lc.path) for lc in lifecycles]
-        most_persistent = max(persistence_scores, key=lambda x: x[0])[1] if persistence_scores else []
+        avg_detection_count = np.fromiter(
+            (lc.detection_count for lc in lifecycles), dtype=np.float64, count=n
+        ).mean()
         
-        # Average persistence score
-        avg_persistence = np.mean([lc.get_persistence_score() for lc in lifecycles])
+        # Persistence scores (computed once, used for max and mean)
+        scores = np.fromiter((lc.get_persistence_score() for lc in lifecycles), dtype=np.float64, count=n)
+        most_persistent = lifecycles[int(scores.argmax())].path
+        avg_persistence = scores.mean()
         
         # Sharpe-like ratio
-        all_returns = []
-        for lc in lifecycles:
-            all_returns.extend([s.return_pct for s in lc.snapshots])
-        
-        if all_returns:
-            sharpe = np.mean(all_returns) / np.std(all_returns) if np.std(all_returns) > 0 else 0
-        else:
-            sharpe = 0
+        return_std = math.sqrt(self._M2 / self._n) if self._n > 1 else 0.0
+        sharpe = self._mean / return_std if return_std > 0 else 0
         
         return PersistenceMetrics(
             total_opportunities=len(self.opportunities),
@@ -237,22 +361,37 @@ class PersistenceTracker:
     
     def _generate_id(self, path: List[str]) -> str:
         """Generate unique ID from path"""
-        # Sort path to handle equivalent cycles
-        sorted_path = sorted(path[:-1])  # Exclude closing token
-        return "|".join(sorted_path)
+        return _path_id(tuple(path))
     
     def _cleanup_stale(self):
         """Remove stale opportunities"""
+        self._obs_since_clean = 0
         current_time = time.time()
-        stale_ids = []
         
-        for opp_id, lifecycle in self.opportunities.items():
-            age_ms = (current_time - lifecycle.last_seen) * 1000
-            if age_ms > self.timeout_ms * 2:  # 2x timeout before deletion
-                stale_ids.append(opp_id)
-        
-        for opp_id in stale_ids:
-            del self.opportunities[opp_id]
+        # Oldest first: stop at the first opportunity that is still fresh
+        while self.opportunities:
+            opp_id = next(iter(self.opportunities))
+            age_ms = (current_time - self.opportunities[opp_id].last_seen) * 1000
+            if age_ms <= self.timeout_ms * 2:  # 2x timeout before deletion
+                break
+            _, lifecycle = self.opportunities.popitem(last=False)
+            self._remove_returns(lifecycle)
+    
+    def _remove_returns(self, lifecycle: OpportunityLifecycle):
+        """Subtract a lifecycle's returns from the running aggregate stats"""
+        n_b = lifecycle._n
+        n_a = self._n - n_b
+        if n_a <= 0:
+            self._n, self._mean, self._M2 = 0, 0.0, 0.0
+            return
+        
+        mean_a = (self._n * self._mean - n_b * lifecycle._mean) / n_a
+        delta = lifecycle._mean - mean_a
+        if n_a == 1:
+            self._M2 = 0.0
+        else:
+            self._M2 = max(self._M2 - lifecycle._M2 - delta * delta * n_a * n_b / self._n, 0.0)
+        self._n, self._mean = n_a, mean_a
     
     def calculate_half_life(self, opportunity_id: str) -> Optional[float]:
         """
@@ -262,18 +401,20 @@ class PersistenceTracker:
             Half-life in milliseconds, or None if not applicable
         """
         lifecycle = self.get_lifecycle(opportunity_id)
-        if not lifecycle or len(lifecycle.snapshots) < 2:
+        if not lifecycle or lifecycle._n < 2:
             return None
         
         peak_return = lifecycle.peak_return
         target_return = peak_return * 0.5
+        n = lifecycle._n
+        timestamps = lifecycle._ts[:n]
         
-        # Find first time return drops below target
-        for snapshot in lifecycle.snapshots:
-            if snapshot.timestamp > lifecycle.peak_timestamp:
-                if snapshot.return_pct <= target_return:
-                    half_life_ms = (snapshot.timestamp - lifecycle.peak_timestamp) * 1000
-                    return half_life_ms
+        # Snapshots are appended in time order: skip everything up to the peak,
+        # then take the first return at or below target
+        start = int(np.searchsorted(timestamps, lifecycle.peak_timestamp, side='right'))
+        hits = np.flatnonzero(lifecycle._ret[start:n] <= target_return)
+        if hits.size:
+            return float((timestamps[start + hits[0]] - lifecycle.peak_timestamp) * 1000)
         
         return None  # Still above half-life
 
@@ -292,18 +433,51 @@ class RegimeDetector:
             window_size: Number of samples for regime classification
         """
         self.window_size = window_size
-        self.price_history = defaultdict(list)
-        self.volume_history = defaultdict(list)
+        
+        # One ring-buffer row per symbol; rows grow by amortized doubling
+        self._row: Dict[str, int] = {}
+        self._prices = np.empty((0, window_size), dtype=np.float32)
+        self._volumes = np.empty((0, window_size), dtype=np.float32)
+        self._counts = np.zeros(0, dtype=np.int64)
+    
+    def _add_symbol(self, symbol: str) -> int:
+        """Assign a buffer row to a new symbol"""
+        row = len(self._row)
+        if row == self._prices.shape[0]:
+            capacity = max(2 * row, 8)
+            prices = np.empty((capacity, self.window_size), dtype=np.float32)
+            volumes = np.empty((capacity, self.window_size), dtype=np.float32)
+            counts = np.zeros(capacity, dtype=np.int64)
+            prices[:row] = self._prices
+            volumes[:row] = self._volumes
+            counts[:row] = self._counts
+            self._prices, self._volumes, self._counts = prices, volumes, counts
+        
+        self._row[symbol] = row
+        return row
     
     def add_observation(self, symbol: str, price: float, volume: float):
         """Add market observation"""
-        self.price_history[symbol].append(price)
-        self.volume_history[symbol].append(volume)
-        
-        # Keep only recent window
-        if len(self.price_history[symbol]) > self.window_size:
-            self.price_history[symbol] = self.price_history[symbol][-self.window_size:]
-            self.volume_history[symbol] = self.volume_history[symbol][-self.window_size:]
+        row = self._row.get(symbol)
+        if row is None:
+            row = self._add_symbol(symbol)
+        
+        # Overwrite the oldest sample once the window is full
+        idx = self._counts[row] % self.window_size
+        self._prices[row, idx] = price
+        self._volumes[row, idx] = volume
+        self._counts[row] += 1
+    
+    def _window(self, buffer: np.ndarray, row: int) -> np.ndarray:
+        """Samples of ``row`` in chronological order"""
+        count = int(self._counts[row])
+        if count <= self.window_size:
+            return buffer[row, :count]
+        
+        head = count % self.window_size
+        if head == 0:
+            return buffer[row]
+        return np.concatenate((buffer[row, head:], buffer[row, :head]))
     
     def detect_regime(self, symbol: str) -> Dict[str, Any]:
         """
@@ -312,8 +486,12 @@ class RegimeDetector:
         Returns:
             Dict with regime classification
         """
-        prices = self.price_history.get(symbol, [])
-        volumes = self.volume_history.get(symbol, [])
+        row = self._row.get(symbol)
+        if row is None:
+            prices = volumes = np.empty(0)
+        else:
+            prices = self._window(self._prices, row)
+            volumes = self._window(self._volumes, row)
         
         if len(prices) < 20:
             return {
@@ -344,8 +522,11 @@ class RegimeDetector:
         else:
             liq_regime = 'high'
         
-        # Trend classification (simple)
-        trend = np.polyfit(range(len(prices)), prices, 1)[0]
+        # Trend classification (simple): closed-form least-squares slope
+        # against x = 0..n-1, using centered x so sum(x - x_mean) = 0
+        n = len(prices)
+        x_centered = np.arange(n) - (n - 1) / 2.0
+        trend = np.dot(x_centered, prices) / (n * (n * n - 1) / 12.0)
         
         if abs(trend) < np.std(prices) * 0.1:
             trend_regime = 'mean_reverting'
@@ -354,7 +535,7 @@ class RegimeDetector:
         
         return {
             'volatility_regime': vol_regime,
-            'volatility_value': volatility,
+            'volatility_value': float(volatility),
             'liquidity_regime': liq_regime,
             'trend_regime': trend_regime,
             'confidence': min(len(prices) / self.window_size, 1.0)
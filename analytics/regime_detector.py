@@ -3,12 +3,24 @@ Regime Detector
 Classifies market regimes for risk adjustment
 """
 
+import math
 import numpy as np
 from typing import Dict, List, Any
-from collections import deque
 from dataclasses import dataclass
 from enum import Enum
 
+# Numba is optional; without it the kernels below run as plain Python
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
 
 class VolatilityRegime(Enum):
     """Volatility classifications"""
@@ -37,7 +49,144 @@ class TrendRegime(Enum):
     STRONG_UPTREND = "strong_uptrend"
 
 
-@dataclass
+# Classification thresholds (ascending) and the regime for each bucket;
+# a value v falls in bucket searchsorted(thresholds, v, side='right')
+_VOL_THRESH = np.array([0.20, 0.40, 0.60, 0.80])
+_VOL_ENUMS = (VolatilityRegime.VERY_LOW, VolatilityRegime.LOW, VolatilityRegime.MODERATE,
+              VolatilityRegime.HIGH, VolatilityRegime.VERY_HIGH)
+
+_LIQ_THRESH = np.array([0.5, 0.75, 1.25, 1.5])
+_LIQ_ENUMS = (LiquidityRegime.DROUGHT, LiquidityRegime.LOW, LiquidityRegime.NORMAL,
+              LiquidityRegime.HIGH, LiquidityRegime.ABUNDANT)
+
+_TREND_THRESH = np.array([-0.5, -0.2, 0.2, 0.5])
+_TREND_ENUMS = (TrendRegime.STRONG_DOWNTREND, TrendRegime.DOWNTREND, TrendRegime.SIDEWAYS,
+                TrendRegime.UPTREND, TrendRegime.STRONG_UPTREND)
+
+
+@njit(cache=True, fastmath=True)
+def _vol_kernel(prices):
+    """Population std of simple returns over ``prices``"""
+    n = prices.shape[0] - 1
+    if n < 1:
+        return 0.0
+    
+    total = 0.0
+    total_sq = 0.0
+    for i in range(n):
+        r = (prices[i + 1] - prices[i]) / prices[i]
+        total += r
+        total_sq += r * r
+    
+    mean = total / n
+    var = total_sq / n - mean * mean
+    return math.sqrt(var) if var > 0.0 else 0.0
+
+
+@njit(cache=True, fastmath=True)
+def _trend_kernel(prices):
+    """
+    Closed-form linear regression of ``prices`` against 0..n-1
+    
+    Returns:
+        (slope, price_std, r_squared)
+    """
+    n = prices.shape[0]
+    if n < 2:
+        return 0.0, 0.0, 0.0
+    
+    # Shift by the first price to avoid cancellation on large price levels
+    shift = prices[0]
+    sy = 0.0
+    syy = 0.0
+    sxy = 0.0
+    for i in range(n):
+        y = prices[i] - shift
+        sy += y
+        syy += y * y
+        sxy += i * y
+    
+    sx = n * (n - 1) / 2.0
+    sxx = n * (n - 1) * (2 * n - 1) / 6.0
+    
+    s_xx = sxx - sx * sx / n
+    s_xy = sxy - sx * sy / n
+    ss_tot = syy - sy * sy / n
+    if ss_tot < 0.0:
+        ss_tot = 0.0
+    
+    slope = s_xy / s_xx
+    price_std = math.sqrt(ss_tot / n)
+    
+    if ss_tot > 0.0:
+        ss_res = ss_tot - slope * s_xy
+        r_squared = 1.0 - ss_res / ss_tot
+    else:
+        r_squared = 0.0
+    
+    return slope, price_std, r_squared
+
+
+@njit(cache=True, fastmath=True)
+def _liq_kernel(volumes, short, long):
+    """Ratio of the short-window mean volume to the long-window mean"""
+    n = volumes.shape[0]
+    short_start = n - short if n > short else 0
+    long_start = n - long if n > long else 0
+    
+    recent_sum = 0.0
+    historical_sum = 0.0
+    for i in range(long_start, n):
+        historical_sum += volumes[i]
+    for i in range(short_start, n):
+        recent_sum += volumes[i]
+    
+    recent_avg = recent_sum / (n - short_start)
+    historical_avg = historical_sum / (n - long_start)
+    
+    return recent_avg / historical_avg if historical_avg > 0 else 0.5
+
+
+class _HistoryBuffer:
+    """
+    Fixed-capacity ring buffer of price/volume/spread observations
+    
+    Writes are scalar stores at ``count % capacity``; reads hand back a
+    view of the most recent samples whenever they are contiguous.
+    """
+    
+    __slots__ = ('capacity', 'prices', 'volumes', 'spreads', 'count')
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        # float32 halves the footprint; ample precision for classification
+        self.prices = np.empty(capacity, dtype=np.float32)
+        self.volumes = np.empty(capacity, dtype=np.float32)
+        self.spreads = np.empty(capacity, dtype=np.float32)
+        self.count = 0
+    
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+    
+    def append(self, price: float, volume: float, spread: float):
+        idx = self.count % self.capacity
+        self.prices[idx] = price
+        self.volumes[idx] = volume
+        self.spreads[idx] = spread
+        self.count += 1
+    
+    def tail(self, column: np.ndarray, n: int) -> np.ndarray:
+        """Most recent ``n`` samples of ``column`` in chronological order"""
+        n = min(n, len(self))
+        head = self.count % self.capacity
+        if self.count <= self.capacity or head >= n:
+            end = head if head else len(self)
+            return column[end - n:end]
+        # Wrapped around the end of the buffer
+        return np.concatenate((column[self.capacity - (n - head):], column[:head]))
+
+
+@dataclass(slots=True)
 class RegimeState:
     """Current market regime"""
     volatility: VolatilityRegime
@@ -70,9 +219,12 @@ class AdvancedRegimeDetector:
         self.long_window = long_window
         self.max_history = max_history
         
-        self.price_history: Dict[str, deque] = {}
-        self.volume_history: Dict[str, deque] = {}
-        self.spread_history: Dict[str, deque] = {}
+        self.history: Dict[str, _HistoryBuffer] = {}
+        
+        # Loop-invariant scaffolding, built once per detector
+        self._ann_factor = math.sqrt(365 * 24)  # Assuming hourly data
+        self._x_centered = np.arange(short_window, dtype=np.float64) - (short_window - 1) / 2.0
+        self._x_var = float(self._x_centered @ self._x_centered)
     
     def update(self, 
                symbol: str,
@@ -80,14 +232,11 @@ class AdvancedRegimeDetector:
                volume: float,
                spread: float = 0.0):
         """Update market data"""
-        if symbol not in self.price_history:
-            self.price_history[symbol] = deque(maxlen=self.max_history)
-            self.volume_history[symbol] = deque(maxlen=self.max_history)
-            self.spread_history[symbol] = deque(maxlen=self.max_history)
-        
-        self.price_history[symbol].append(price)
-        self.volume_history[symbol].append(volume)
-        self.spread_history[symbol].append(spread)
+        history = self.history.get(symbol)
+        if history is None:
+            history = self.history[symbol] = _HistoryBuffer(self.max_history)
+        
+        history.append(price, volume, spread)
     
     def detect_regime(self, symbol: str) -> RegimeState:
         """
@@ -96,15 +245,17 @@ class AdvancedRegimeDetector:
         Returns:
             RegimeState with all classifications
         """
-        if symbol not in self.price_history:
+        history = self.history.get(symbol)
+        if history is None:
             return self._default_regime()
         
-        prices = list(self.price_history[symbol])
-        volumes = list(self.volume_history[symbol])
-        
-        if len(prices) < self.short_window:
+        n_samples = len(history)
+        if n_samples < self.short_window:
             return self._default_regime()
         
+        prices = history.tail(history.prices, self.short_window)
+        volumes = history.tail(history.volumes, max(self.short_window, self.long_window))
+        
         # Detect volatility regime
         vol_regime, vol_value = self._detect_volatility(prices)
         
@@ -115,7 +266,7 @@ class AdvancedRegimeDetector:
         trend_regime, trend_strength = self._detect_trend(prices)
         
         # Calculate confidence
-        confidence = min(len(prices) / self.long_window, 1.0)
+        confidence = min(n_samples / self.long_window, 1.0)
         
         # Generate recommendation
         recommendation = self._generate_recommendation(vol_regime, liq_regime, trend_regime)
@@ -131,90 +282,111 @@ class AdvancedRegimeDetector:
             recommendation=recommendation
         )
     
-    def _detect_volatility(self, prices: List[float]) -> tuple:
-        """Detect volatility regime"""
-        # Calculate returns
-        returns = np.diff(prices[-self.short_window:]) / prices[-self.short_window:-1]
+    def detect_regime_batch(self) -> Dict[str, RegimeState]:
+        """
+        Regime detection for every tracked symbol in one vectorized pass
+        
+        Returns:
+            Dict mapping symbol to RegimeState
+        """
+        results: Dict[str, RegimeState] = {}
+        ready = []
+        for symbol, history in self.history.items():
+            if len(history) < self.short_window:
+                results[symbol] = self._default_regime()
+            else:
+                ready.append(symbol)
+        
+        if not ready:
+            return results
+        
+        short = self.short_window
+        width = max(self.short_window, self.long_window)
+        histories = [self.history[symbol] for symbol in ready]
+        
+        # (n_symbols, short_window) price matrix
+        prices = np.stack([h.tail(h.prices, short) for h in histories])
+        
+        # (n_symbols, width) volume matrix, NaN-padded for short histories
+        volumes = np.full((len(ready), width), np.nan)
+        for i, h in enumerate(histories):
+            tail = h.tail(h.volumes, width)
+            volumes[i, width - len(tail):] = tail
         
+        # Volatility: std of simple returns along each row
+        returns = np.diff(prices, axis=1) / prices[:, :-1]
+        vol_values = returns.std(axis=1) * self._ann_factor
+        
+        # Trend: closed-form regression slope and R-squared per row
+        centered = prices - prices.mean(axis=1, keepdims=True)
+        s_xy = centered @ self._x_centered
+        ss_tot = (centered * centered).sum(axis=1)
+        slopes = s_xy / self._x_var
+        price_std = np.sqrt(ss_tot / short)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            normalized_trend = np.where(price_std > 0, slopes / price_std, 0.0)
+            r_squared = np.where(ss_tot > 0, 1 - (ss_tot - slopes * s_xy) / ss_tot, 0.0)
+        
+        # Liquidity: recent mean volume relative to the long-window mean
+        historical_avg = np.nanmean(volumes[:, -self.long_window:], axis=1)
+        recent_avg = volumes[:, -short:].mean(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            liq_values = np.where(historical_avg > 0, recent_avg / historical_avg, 0.5)
+        
+        vol_idx = np.searchsorted(_VOL_THRESH, vol_values, side='right')
+        liq_idx = np.searchsorted(_LIQ_THRESH, liq_values, side='right')
+        trend_idx = np.searchsorted(_TREND_THRESH, normalized_trend, side='right')
+        
+        for i, symbol in enumerate(ready):
+            vol_regime = _VOL_ENUMS[vol_idx[i]]
+            liq_regime = _LIQ_ENUMS[liq_idx[i]]
+            trend_regime = _TREND_ENUMS[trend_idx[i]]
+            results[symbol] = RegimeState(
+                volatility=vol_regime,
+                liquidity=liq_regime,
+                trend=trend_regime,
+                volatility_value=float(vol_values[i]),
+                liquidity_percentile=float(liq_values[i]),
+                trend_strength=float(r_squared[i]),
+                confidence=min(len(histories[i]) / self.long_window, 1.0),
+                recommendation=self._generate_recommendation(vol_regime, liq_regime, trend_regime)
+            )
+        
+        return results
+    
+    def _detect_volatility(self, prices: np.ndarray) -> tuple:
+        """Detect volatility regime"""
         # Realized volatility (annualized)
-        volatility = np.std(returns) * np.sqrt(365 * 24)  # Assuming hourly data
+        volatility = _vol_kernel(prices[-self.short_window:]) * self._ann_factor
         
         # Classify
-        if volatility < 0.20:
-            regime = VolatilityRegime.VERY_LOW
-        elif volatility < 0.40:
-            regime = VolatilityRegime.LOW
-        elif volatility < 0.60:
-            regime = VolatilityRegime.MODERATE
-        elif volatility < 0.80:
-            regime = VolatilityRegime.HIGH
-        else:
-            regime = VolatilityRegime.VERY_HIGH
+        regime = _VOL_ENUMS[int(np.searchsorted(_VOL_THRESH, volatility, side='right'))]
         
         return regime, volatility
     
-    def _detect_liquidity(self, volumes: List[float]) -> tuple:
+    def _detect_liquidity(self, volumes: np.ndarray) -> tuple:
         """Detect liquidity regime"""
-        if len(volumes) < self.long_window:
-            long_window_volumes = volumes
-        else:
-            long_window_volumes = volumes[-self.long_window:]
-        
-        recent_avg = np.mean(volumes[-self.short_window:])
-        historical_avg = np.mean(long_window_volumes)
-        
         # Percentile of recent vs historical
-        percentile = (recent_avg / historical_avg) if historical_avg > 0 else 0.5
+        percentile = _liq_kernel(volumes, self.short_window, self.long_window)
         
         # Classify
-        if percentile < 0.5:
-            regime = LiquidityRegime.DROUGHT
-        elif percentile < 0.75:
-            regime = LiquidityRegime.LOW
-        elif percentile < 1.25:
-            regime = LiquidityRegime.NORMAL
-        elif percentile < 1.5:
-            regime = LiquidityRegime.HIGH
-        else:
-            regime = LiquidityRegime.ABUNDANT
+        regime = _LIQ_ENUMS[int(np.searchsorted(_LIQ_THRESH, percentile, side='right'))]
         
         return regime, percentile
     
-    def _detect_trend(self, prices: List[float]) -> tuple:
+    def _detect_trend(self, prices: np.ndarray) -> tuple:
         """Detect trend regime"""
-        recent_prices = prices[-self.short_window:]
-        
-        # Linear regression
-        x = np.arange(len(recent_prices))
-        coeffs = np.polyfit(x, recent_prices, 1)
-        trend_slope = coeffs[0]
-        
-        # Normalize by price level and volatility
-        avg_price = np.mean(recent_prices)
-        price_std = np.std(recent_prices)
+        # Linear regression slope and R-squared for trend strength
+        trend_slope, price_std, r_squared = _trend_kernel(prices[-self.short_window:])
         
+        # Normalize by volatility
         if price_std > 0:
             normalized_trend = trend_slope / price_std
         else:
             normalized_trend = 0
         
-        # R-squared for trend strength
-        fitted = np.polyval(coeffs, x)
-        ss_res = np.sum((recent_prices - fitted) ** 2)
-        ss_tot = np.sum((recent_prices - np.mean(recent_prices)) ** 2)
-        r_squared = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0
-        
         # Classify
-        if normalized_trend < -0.5:
-            regime = TrendRegime.STRONG_DOWNTREND
-        elif normalized_trend < -0.2:
-            regime = TrendRegime.DOWNTREND
-        elif normalized_trend < 0.2:
-            regime = TrendRegime.SIDEWAYS
-        elif normalized_trend < 0.5:
-            regime = TrendRegime.UPTREND
-        else:
-            regime = TrendRegime.STRONG_UPTREND
+        regime = _TREND_ENUMS[int(np.searchsorted(_TREND_THRESH, normalized_trend, side='right'))]
         
         return regime, r_squared
     
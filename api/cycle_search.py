@@ -0,0 +1,391 @@
+"""
+Cycle Search Kernel
+Compiled (parallel) DFS cycle enumeration for the Python fallback scanner
+"""
+
+import math
+import threading
+
+import numpy as np
+
+# Optional JIT compilation (pure Python fallback if Numba is missing)
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# Cycles with a raw profit above this are reported (near-profitable included)
+MIN_RAW_PROFIT = -0.005
+
+# The same threshold on a cycle's summed log(rate * (1 - fee)) edge weights
+LOG_MIN_PROFIT = math.log1p(MIN_RAW_PROFIT)
+
+# Prefix pruning only drops paths that miss the threshold by more than
+# this, so rounding in the bound can never discard a reportable cycle
+PRUNE_SLACK = 1e-9
+
+# Most cycles a single search reports (output arenas scale with it)
+MAX_CYCLES_LIMIT = 1000
+
+# Numba's default workqueue threading layer aborts the process when two
+# threads launch parallel kernels at once, and scans run in worker threads
+_launch_lock = threading.Lock()
+
+
+@njit(cache=True)
+def _same_key(seen, row, key):
+    """Whether row ``row`` of ``seen`` equals ``key``"""
+    for j in range(key.shape[0]):
+        if seen[row, j] != key[j]:
+            return False
+    return True
+
+
+@njit(cache=True, nogil=True)
+def scc_labels(offsets, dst, weight):
+    """
+    Strongly connected component id of every token (iterative Tarjan)
+
+    Only edges with a finite weight count, since untradeable edges can never
+    be part of a reported cycle.
+    """
+    n_tokens = offsets.shape[0] - 1
+    index = np.full(n_tokens, -1, np.int64)
+    low = np.zeros(n_tokens, np.int64)
+    on_stack = np.zeros(n_tokens, np.bool_)
+    labels = np.full(n_tokens, -1, np.int64)
+
+    # Tarjan's node stack, and the explicit call stack of (token, next edge)
+    stack = np.empty(n_tokens, np.int64)
+    call_node = np.empty(n_tokens, np.int64)
+    call_edge = np.empty(n_tokens, np.int64)
+    n_stack = 0
+    counter = 0
+    n_components = 0
+
+    for root in range(n_tokens):
+        if index[root] != -1:
+            continue
+
+        index[root] = counter
+        low[root] = counter
+        counter += 1
+        stack[n_stack] = root
+        n_stack += 1
+        on_stack[root] = True
+        call_node[0] = root
+        call_edge[0] = offsets[root]
+        depth = 1
+
+        while depth > 0:
+            v = call_node[depth - 1]
+            e = call_edge[depth - 1]
+
+            if e < offsets[v + 1]:
+                call_edge[depth - 1] = e + 1
+                if weight[e] == -np.inf:
+                    continue
+                w = dst[e]
+                if index[w] == -1:
+                    # Recurse into w
+                    index[w] = counter
+                    low[w] = counter
+                    counter += 1
+                    stack[n_stack] = w
+                    n_stack += 1
+                    on_stack[w] = True
+                    call_node[depth] = w
+                    call_edge[depth] = offsets[w]
+                    depth += 1
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+            else:
+                # v is finished: pop its component if it is a root
+                depth -= 1
+                if low[v] == index[v]:
+                    while True:
+                        n_stack -= 1
+                        w = stack[n_stack]
+                        on_stack[w] = False
+                        labels[w] = n_components
+                        if w == v:
+                            break
+                    n_components += 1
+                if depth > 0 and low[v] < low[call_node[depth - 1]]:
+                    low[call_node[depth - 1]] = low[v]
+
+    return labels
+
+
+@njit(cache=True, nogil=True, boundscheck=False)
+def _cycles_from(start, offsets, dst, weight, exch, max_cycles, max_depth, max_deg, max_gain,
+                 node_gain, labels, n_words, out_path, out_exch, out_len, out_log):
+    """
+    DFS for the cycles whose smallest token id is ``start``
+
+    Only tokens with a larger id are visited, so every cycle is found from
+    exactly one start, and only tokens in the start's strongly connected
+    component. Prefixes whose best possible completion misses the
+    threshold are not descended: the next hop adds at most ``node_gain``
+    of the token it leaves, every later hop at most ``max_gain``.
+    Cycles are deduplicated on (token sequence, exchange set), the set held
+    as a bitmask of ``n_words`` 63-bit words, and at most ``max_cycles`` are
+    written to the output rows.
+
+    Returns:
+        Number of cycles written
+    """
+    n_tokens = offsets.shape[0] - 1
+    component = labels[start]
+
+    # Shared DFS state: token, log weight sum and outgoing exchange per
+    # depth, plus the edges still to descend into from each depth
+    path = np.empty(max_depth, np.int64)
+    logs = np.empty(max_depth, np.float64)
+    exs = np.empty(max_depth, np.int64)
+    pending = np.empty((max_depth, max(max_deg, 1)), np.int64)
+    n_pending = np.zeros(max_depth, np.int64)
+    in_path = np.zeros(n_tokens, np.bool_)
+
+    # Bitmask of the exchanges used to reach each depth
+    masks = np.zeros((max_depth, n_words), np.int64)
+
+    # Dedup keys of stored cycles; a hash of each key indexes its row (rows
+    # are still compared in full, a rare collision falls back to a scan)
+    key_len = max_depth + n_words
+    seen = np.empty((max_cycles, key_len), np.int64)
+    seen_index = dict()
+    key = np.empty(key_len, np.int64)
+
+    found = 0
+    depth = 0
+    path[0] = start
+    logs[0] = 0.0
+    in_path[start] = True
+    expand = True
+
+    while depth >= 0:
+        if expand:
+            # Visit the token at this depth: record cycles, queue descents
+            current = path[depth]
+            log_sum = logs[depth]
+            length = depth + 1
+            n_pending[depth] = 0
+
+            # Most the hops after an edge and the one leaving its target can add
+            hops_left = max_depth - length
+            rest = (hops_left - 1) * max_gain if max_gain > 0 else 0.0
+
+            for e in range(offsets[current], offsets[current + 1]):
+                w = weight[e]
+                if w == -np.inf:
+                    continue
+
+                nxt = dst[e]
+
+                # Completed a cycle back to start
+                if nxt == start:
+                    if length < 3:
+                        continue
+                    new_log = log_sum + w
+                    if new_log <= LOG_MIN_PROFIT:
+                        continue
+
+                    # Dedup key: token sequence plus the exchange set bitmask
+                    for j in range(max_depth):
+                        key[j] = path[j] if j < length else -1
+                    x = exch[e]
+                    exs[length - 1] = x
+                    key[max_depth:] = masks[depth]
+                    key[max_depth + x // 63] |= np.int64(1) << (x % 63)
+
+                    h = np.uint64(14695981039346656037)  # FNV-1a
+                    for j in range(key_len):
+                        h = (h ^ np.uint64(key[j] + 1)) * np.uint64(1099511628211)
+
+                    if h in seen_index:
+                        if _same_key(seen, seen_index[h], key):
+                            continue
+                        duplicate = False
+                        for k in range(found):
+                            if _same_key(seen, k, key):
+                                duplicate = True
+                                break
+                        if duplicate:
+                            continue
+                    else:
+                        seen_index[h] = found
+
+                    seen[found] = key
+                    out_path[found, :length] = path[:length]
+                    out_path[found, length] = start
+                    out_exch[found, :length] = exs[:length]
+                    out_len[found] = length
+                    out_log[found] = new_log
+                    found += 1
+                    if found >= max_cycles:
+                        break
+
+                # Continue DFS if not too deep and not revisiting
+                elif (nxt > start and labels[nxt] == component
+                      and not in_path[nxt] and length < max_depth):
+                    if log_sum + w + node_gain[nxt] + rest <= LOG_MIN_PROFIT - PRUNE_SLACK:
+                        continue
+                    pending[depth, n_pending[depth]] = e
+                    n_pending[depth] += 1
+
+        if n_pending[depth] > 0 and found < max_cycles:
+            # Descend along the most recently queued edge
+            n_pending[depth] -= 1
+            e = pending[depth, n_pending[depth]]
+            x = exch[e]
+            exs[depth] = x
+            logs[depth + 1] = logs[depth] + weight[e]
+            masks[depth + 1] = masks[depth]
+            masks[depth + 1, x // 63] |= np.int64(1) << (x % 63)
+            depth += 1
+            path[depth] = dst[e]
+            in_path[dst[e]] = True
+            expand = True
+        else:
+            # Backtrack
+            in_path[path[depth]] = False
+            depth -= 1
+            expand = False
+
+    return found
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def find_cycles(offsets, dst, weight, exch, max_cycles, max_depth):
+    """
+    Enumerate cycles by depth-first search from every token in parallel
+
+    The graph is in CSR form: edges leaving token ``u`` are
+    ``offsets[u]:offsets[u + 1]`` in insertion order, and ``weight`` holds
+    each edge's ``log(rate * (1 - fee))`` (``-inf`` for untradeable edges).
+    Each start token searches independently for the cycles it is the
+    smallest id of (up to ``max_cycles``); the results are merged in start
+    order and the ``max_cycles`` most profitable are kept (ties keep that
+    order).
+
+    Returns:
+        (paths, exchanges, lengths, log_sums) where row ``k`` of ``paths``
+        holds ``lengths[k] + 1`` token ids (closing token included), row
+        ``k`` of ``exchanges`` holds ``lengths[k]`` ids and ``log_sums[k]``
+        is the cycle's summed edge weight
+    """
+    n_tokens = offsets.shape[0] - 1
+    max_cycles = max(max_cycles, 0)
+
+    # Largest out-degree, and the best edge weight leaving each token
+    max_deg = 0
+    node_gain = np.full(n_tokens, -np.inf)
+    for u in range(n_tokens):
+        deg = offsets[u + 1] - offsets[u]
+        if deg > max_deg:
+            max_deg = deg
+        for e in range(offsets[u], offsets[u + 1]):
+            if weight[e] > node_gain[u]:
+                node_gain[u] = weight[e]
+    max_gain = node_gain.max() if n_tokens > 0 else 0.0
+
+    # Words needed for a bitmask over every exchange id
+    n_words = (exch.max() + 63) // 63 if exch.shape[0] > 0 else 1
+
+    # Cycles stay within a component, and a start only finds cycles through
+    # larger ids: count the component's tokens from each start upwards
+    labels = scc_labels(offsets, dst, weight)
+    n_components = labels.max() + 1 if n_tokens > 0 else 0
+    remaining = np.zeros(n_components, np.int64)
+    reach = np.empty(n_tokens, np.int64)
+    for u in range(n_tokens - 1, -1, -1):
+        remaining[labels[u]] += 1
+        reach[u] = remaining[labels[u]]
+
+    # Rows each start can need: none with fewer than 3 tokens to visit, else
+    # at most its closed walks of 3..max_depth hops (out-degree of start,
+    # times max_deg per later hop), and never more than max_cycles
+    limit = np.zeros(n_tokens, np.int64)
+    for start in range(n_tokens):
+        if reach[start] < 3:
+            continue
+        walks = 0.0
+        for hops in range(3, max_depth + 1):
+            walks += (offsets[start + 1] - offsets[start]) * float(max_deg) ** (hops - 1)
+        limit[start] = max_cycles if walks >= max_cycles else np.int64(walks)
+
+    # One output arena, each start writing its own block of rows (left
+    # uninitialized: only written rows are read)
+    base = np.zeros(n_tokens + 1, np.int64)
+    base[1:] = np.cumsum(limit)
+    out_path = np.empty((base[n_tokens], max_depth + 1), np.int64)
+    out_exch = np.empty((base[n_tokens], max_depth), np.int64)
+    out_len = np.empty(base[n_tokens], np.int64)
+    out_log = np.empty(base[n_tokens], np.float64)
+    counts = np.zeros(n_tokens, np.int64)
+
+    for start in prange(n_tokens):
+        if limit[start] > 0:
+            lo = base[start]
+            hi = base[start + 1]
+            counts[start] = _cycles_from(
+                start, offsets, dst, weight, exch, limit[start], max_depth, max_deg, max_gain,
+                node_gain, labels, n_words,
+                out_path[lo:hi], out_exch[lo:hi], out_len[lo:hi], out_log[lo:hi]
+            )
+
+    # Merge in start order, then keep the most profitable
+    total = counts.sum()
+    paths = np.empty((total, max_depth + 1), np.int64)
+    exchanges = np.empty((total, max_depth), np.int64)
+    lengths = np.empty(total, np.int64)
+    log_sums = np.empty(total, np.float64)
+    k = 0
+    for start in range(n_tokens):
+        for c in range(base[start], base[start] + counts[start]):
+            paths[k] = out_path[c]
+            exchanges[k] = out_exch[c]
+            lengths[k] = out_len[c]
+            log_sums[k] = out_log[c]
+            k += 1
+
+    keep = np.argsort(-log_sums, kind='mergesort')[:max_cycles]
+    return paths[keep], exchanges[keep], lengths[keep], log_sums[keep]
+
+
+def search_cycles(offsets, dst, weight, exch, max_cycles, max_depth):
+    """
+    ``find_cycles``, with concurrent calls from worker threads taking turns
+
+    ``max_cycles`` is clamped to ``0..MAX_CYCLES_LIMIT``; with nothing to
+    report the kernel is not launched at all.
+    """
+    max_cycles = min(max_cycles, MAX_CYCLES_LIMIT)
+    if max_cycles <= 0:
+        return (np.empty((0, max_depth + 1), np.int64), np.empty((0, max_depth), np.int64),
+                np.empty(0, np.int64), np.empty(0, np.float64))
+    with _launch_lock:
+        return find_cycles(offsets, dst, weight, exch, max_cycles, max_depth)
+
+
+def warm_up():
+    """
+    Compile (or load the cached) kernel with a tiny triangle graph
+
+    Not run at import, so worker processes that import the API skip it;
+    the server calls it once at startup.
+    """
+    offsets = np.array([0, 1, 2, 3], dtype=np.int64)
+    dst = np.array([1, 2, 0], dtype=np.int64)
+    weight = np.full(3, np.log(0.999), dtype=np.float64)
+    search_cycles(offsets, dst, weight, np.zeros(3, dtype=np.int64), 1, 5)
+
@@ -7,9 +7,71 @@ from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 
 
-@dataclass
+# Static text shared by every explanation, built once at import time
+_DETECTION_METHOD_TEXT = (
+    "Detection Methodology:\n"
+    "OmniQuant uses graph-theoretic negative cycle detection (Bellman-Ford algorithm) "
+    "to identify arbitrage opportunities. Exchange rates are converted to log-space weights, "
+    "transforming multiplicative arbitrage into additive cycles."
+)
+
+_GENERAL_GUIDANCE_TEXT = (
+    "\n\nGeneral Guidance:\n"
+    "- Always verify opportunities independently\n"
+    "- Start with small position sizes\n"
+    "- Monitor execution quality\n"
+    "- Consider total portfolio risk"
+)
+
+# Overall guidance by (max risk score, min confidence or None), checked in order
+_REC_TABLE = (
+    (30, 70, "This opportunity shows favorable risk-return characteristics."),
+    (50, 60, "This opportunity has moderate risk with reasonable confidence."),
+    (70, None, "This opportunity carries elevated risk. Proceed with caution."),
+)
+_REC_HIGH_RISK_TEXT = "This opportunity has high risk. Consider avoiding or reducing exposure."
+
+_DISCLAIMER_TEXT = (
+    "⚠️ MANDATORY DISCLAIMER:\n"
+    "OmniQuant is a research and educational arbitrage detection simulator. "
+    "All opportunities shown are theoretical and generated under simulated market conditions. "
+    "No trades are executed. No financial returns are guaranteed. "
+    "Users are responsible for independent verification before making financial decisions. "
+    "This is NOT financial advice."
+)
+
+# Portfolio allocation explanation; static body with format_map placeholders
+_ALLOC_TEMPLATE = (
+    "Portfolio Allocation Summary:\n\n"
+    "Total Capital: ${total:,.2f}\n"
+    "Allocated: ${allocated:,.2f} ({util_pct:.1f}%)\n"
+    "Number of Opportunities: {num_opps}\n"
+    "Expected Portfolio Return: {port_return_pct:.3f}%\n"
+    "Portfolio Risk Score: {port_risk:.1f}/100\n\n"
+    
+    "Allocation Strategy:\n"
+    "The capital allocator uses a risk-adjusted optimization approach, "
+    "maximizing expected returns while respecting:\n"
+    "- Total capital constraints\n"
+    "- Individual position limits (max 30% per opportunity)\n"
+    "- Portfolio risk budget\n"
+    "- Liquidity constraints\n\n"
+    
+    "Each opportunity is ranked by its risk-adjusted return score: "
+    "(Expected Return × Confidence) / Risk Score\n\n"
+    
+    "{disclaimer}"
+)
+
+
+@dataclass(frozen=True)
 class Explanation:
-    """Structured explanation"""
+    """
+    Structured explanation
+    
+    Frozen so that format_for_display can memoize renders on the instance
+    (outside the dataclass fields).
+    """
     summary: str
     detailed_analysis: str
     key_metrics: Dict[str, str]
@@ -44,14 +106,17 @@ class ExplanationEngine:
         Returns:
             Explanation object
         """
+        # Joined once, shared by the summary and the key metrics
+        path_str = " → ".join(opportunity['path'])
+        
         # Generate summary
-        summary = self._generate_summary(opportunity)
+        summary = self._generate_summary(opportunity, path_str)
         
         # Detailed analysis
         detailed = self._generate_detailed_analysis(opportunity)
         
         # Key metrics
-        metrics = self._format_key_metrics(opportunity)
+        metrics = self._format_key_metrics(opportunity, path_str)
         
         # Risk summary
         risk_summary = self._generate_risk_summary(opportunity)
@@ -71,11 +136,11 @@ class ExplanationEngine:
             disclaimer=disclaimer
         )
     
-    def _generate_summary(self, opp: Dict[str, Any]) -> str:
+    def _generate_summary(self, opp: Dict[str, Any], path_str: str) -> str:
         """Generate plain-English summary"""
-        path_str = " → ".join(opp['path'])
         return_pct = opp['expected_return'] * 100
         confidence = opp['confidence']
+        risk_score = opp['risk_score']
         risk_level = opp.get('risk_level', 'moderate')
         
         # Build summary based on technical level
@@ -88,8 +153,8 @@ class ExplanationEngine:
         
         elif self.technical_level == 'advanced':
             mc_info = ""
-            if 'monte_carlo' in opp:
-                mc = opp['monte_carlo']
+            mc = opp.get('monte_carlo')
+            if mc is not None:
                 mc_info = (
                     f" Monte Carlo analysis (n={opp.get('mc_simulations', 1000)}) shows "
                     f"mean return of {mc['mean_return']*100:.3f}% with "
@@ -101,7 +166,7 @@ class ExplanationEngine:
             summary = (
                 f"Multi-hop arbitrage cycle detected: {path_str}. "
                 f"Theoretical return: {return_pct:.4f}%.{mc_info} "
-                f"Risk score: {opp['risk_score']:.1f}/100. "
+                f"Risk score: {risk_score:.1f}/100. "
                 f"Confidence: {confidence:.1f}%."
             )
         
@@ -110,7 +175,7 @@ class ExplanationEngine:
                 f"OmniQuant identified a temporary pricing imbalance across {len(opp['path'])-1} exchanges. "
                 f"Path: {path_str}. "
                 f"Expected return: {return_pct:.3f}%. "
-                f"Risk assessment: {risk_level} ({opp['risk_score']:.0f}/100). "
+                f"Risk assessment: {risk_level} ({risk_score:.0f}/100). "
                 f"Confidence: {confidence:.0f}%."
             )
         
@@ -121,13 +186,7 @@ class ExplanationEngine:
         sections = []
         
         # 1. Detection methodology
-        det_method = (
-            "Detection Methodology:\n"
-            "OmniQuant uses graph-theoretic negative cycle detection (Bellman-Ford algorithm) "
-            "to identify arbitrage opportunities. Exchange rates are converted to log-space weights, "
-            "transforming multiplicative arbitrage into additive cycles."
-        )
-        sections.append(det_method)
+        sections.append(_DETECTION_METHOD_TEXT)
         
         # 2. Execution model
         exec_model = (
@@ -141,8 +200,8 @@ class ExplanationEngine:
         sections.append(exec_model)
         
         # 3. Monte Carlo results
-        if 'monte_carlo' in opp:
-            mc = opp['monte_carlo']
+        mc = opp.get('monte_carlo')
+        if mc is not None:
             mc_section = (
                 "Statistical Validation:\n"
                 f"Monte Carlo simulation with {opp.get('mc_simulations', 1000)} iterations shows:\n"
@@ -156,8 +215,8 @@ class ExplanationEngine:
             sections.append(mc_section)
         
         # 4. Stress test results
-        if 'stress_test' in opp:
-            st = opp['stress_test']
+        st = opp.get('stress_test')
+        if st is not None:
             st_section = (
                 "Stress Testing:\n"
                 f"Robustness score: {st['robustness_score']:.0f}% ({st['overall_rating']})\n"
@@ -169,31 +228,28 @@ class ExplanationEngine:
         
         return "\n\n".join(sections)
     
-    def _format_key_metrics(self, opp: Dict[str, Any]) -> Dict[str, str]:
+    def _format_key_metrics(self, opp: Dict[str, Any], path_str: str) -> Dict[str, str]:
         """Format key metrics for display"""
-        metrics = {
-            "Path": " → ".join(opp['path']),
+        mc = opp.get('monte_carlo')
+        st = opp.get('stress_test')
+        half_life = opp.get('latency_half_life_ms')
+        
+        # Built in one literal; optional sections unpack to nothing when absent
+        return {
+            "Path": path_str,
             "Expected Return": f"{opp['expected_return']*100:.3f}%",
             "Risk Score": f"{opp['risk_score']:.1f}/100",
             "Risk Level": opp.get('risk_level', 'N/A'),
             "Confidence": f"{opp['confidence']:.1f}%",
             "Path Length": str(opp['path_length']),
+            **({
+                "Monte Carlo Mean": f"{mc['mean_return']*100:.3f}%",
+                "Worst 5% Outcome": f"{mc['worst_5pct']*100:.3f}%",
+                "Prob. Negative": f"{mc['probability_negative']*100:.1f}%",
+            } if mc is not None else {}),
+            **({"Stress Robustness": f"{st['robustness_score']:.0f}%"} if st is not None else {}),
+            **({"Latency Half-Life": f"{half_life:.0f} ms"} if half_life is not None else {}),
         }
-        
-        if 'monte_carlo' in opp:
-            mc = opp['monte_carlo']
-            metrics["Monte Carlo Mean"] = f"{mc['mean_return']*100:.3f}%"
-            metrics["Worst 5% Outcome"] = f"{mc['worst_5pct']*100:.3f}%"
-            metrics["Prob. Negative"] = f"{mc['probability_negative']*100:.1f}%"
-        
-        if 'stress_test' in opp:
-            st = opp['stress_test']
-            metrics["Stress Robustness"] = f"{st['robustness_score']:.0f}%"
-        
-        if 'latency_half_life_ms' in opp:
-            metrics["Latency Half-Life"] = f"{opp['latency_half_life_ms']:.0f} ms"
-        
-        return metrics
     
     def _generate_risk_summary(self, opp: Dict[str, Any]) -> str:
         """Generate risk summary"""
@@ -207,17 +263,18 @@ class ExplanationEngine:
         
         if warnings:
             summary_parts.append("\nRisk Factors:")
-            for warning in warnings:
-                summary_parts.append(f"  {warning}")
-        
-        # Add risk components if available
-        if 'risk_components' in opp:
-            comp = opp['risk_components']
-            summary_parts.append("\nRisk Breakdown:")
-            summary_parts.append(f"  - Liquidity Risk: {comp.get('liquidity_risk', 0):.0f}/100")
-            summary_parts.append(f"  - Complexity Risk: {comp.get('complexity_risk', 0):.0f}/100")
-            summary_parts.append(f"  - Volatility Risk: {comp.get('volatility_risk', 0):.0f}/100")
-            summary_parts.append(f"  - Execution Risk: {comp.get('execution_risk', 0):.0f}/100")
+            summary_parts.extend([f"  {warning}" for warning in warnings])
+        
+        # Add risk components if available (fixed shape: one f-string)
+        comp = opp.get('risk_components')
+        if comp is not None:
+            summary_parts.append(
+                f"\nRisk Breakdown:\n"
+                f"  - Liquidity Risk: {comp.get('liquidity_risk', 0):.0f}/100\n"
+                f"  - Complexity Risk: {comp.get('complexity_risk', 0):.0f}/100\n"
+                f"  - Volatility Risk: {comp.get('volatility_risk', 0):.0f}/100\n"
+                f"  - Execution Risk: {comp.get('execution_risk', 0):.0f}/100"
+            )
         
         return "\n".join(summary_parts)
     
@@ -229,76 +286,90 @@ class ExplanationEngine:
         
         rec_parts = []
         
-        # Overall guidance
-        if risk_score < 30 and confidence > 70:
-            rec_parts.append("This opportunity shows favorable risk-return characteristics.")
-        elif risk_score < 50 and confidence > 60:
-            rec_parts.append("This opportunity has moderate risk with reasonable confidence.")
-        elif risk_score < 70:
-            rec_parts.append("This opportunity carries elevated risk. Proceed with caution.")
-        else:
-            rec_parts.append("This opportunity has high risk. Consider avoiding or reducing exposure.")
+        # Overall guidance: first row with risk below max and confidence above min
+        guidance = _REC_HIGH_RISK_TEXT
+        for max_risk, min_confidence, text in _REC_TABLE:
+            if risk_score < max_risk and (min_confidence is None or confidence > min_confidence):
+                guidance = text
+                break
+        rec_parts.append(guidance)
         
         # Specific recommendations
         if recommendations:
             rec_parts.append("\nSpecific Recommendations:")
-            for rec in recommendations:
-                rec_parts.append(f"  - {rec}")
+            rec_parts.extend([f"  - {rec}" for rec in recommendations])
         
         # General guidance
-        rec_parts.append(
-            "\n\nGeneral Guidance:\n"
-            "- Always verify opportunities independently\n"
-            "- Start with small position sizes\n"
-            "- Monitor execution quality\n"
-            "- Consider total portfolio risk"
-        )
+        rec_parts.append(_GENERAL_GUIDANCE_TEXT)
         
         return "\n".join(rec_parts)
     
     def _get_disclaimer(self) -> str:
         """Get mandatory disclaimer"""
-        return (
-            "⚠️ MANDATORY DISCLAIMER:\n"
-            "OmniQuant is a research and educational arbitrage detection simulator. "
-            "All opportunities shown are theoretical and generated under simulated market conditions. "
-            "No trades are executed. No financial returns are guaranteed. "
-            "Users are responsible for independent verification before making financial decisions. "
-            "This is NOT financial advice."
-        )
+        return _DISCLAIMER_TEXT
     
     def explain_portfolio_allocation(self, allocation: Dict[str, Any]) -> str:
         """Explain portfolio allocation strategy"""
-        total = allocation['total_capital']
-        allocated = allocation['capital_allocated']
-        util_pct = allocation['utilization_pct']
-        port_return = allocation['expected_portfolio_return']
-        port_risk = allocation['portfolio_risk_score']
-        num_opps = allocation['num_opportunities']
-        
-        explanation = (
-            f"Portfolio Allocation Summary:\n\n"
-            f"Total Capital: ${total:,.2f}\n"
-            f"Allocated: ${allocated:,.2f} ({util_pct:.1f}%)\n"
-            f"Number of Opportunities: {num_opps}\n"
-            f"Expected Portfolio Return: {port_return*100:.3f}%\n"
-            f"Portfolio Risk Score: {port_risk:.1f}/100\n\n"
-            
-            "Allocation Strategy:\n"
-            "The capital allocator uses a risk-adjusted optimization approach, "
-            "maximizing expected returns while respecting:\n"
-            "- Total capital constraints\n"
-            "- Individual position limits (max 30% per opportunity)\n"
-            "- Portfolio risk budget\n"
-            "- Liquidity constraints\n\n"
-            
-            "Each opportunity is ranked by its risk-adjusted return score: "
-            "(Expected Return × Confidence) / Risk Score\n\n"
-            
-            f"{self._get_disclaimer()}"
-        )
+        return _ALLOC_TEMPLATE.format_map({
+            'total': allocation['total_capital'],
+            'allocated': allocation['capital_allocated'],
+            'util_pct': allocation['utilization_pct'],
+            'num_opps': allocation['num_opportunities'],
+            'port_return_pct': allocation['expected_portfolio_return'] * 100,
+            'port_risk': allocation['portfolio_risk_score'],
+            'disclaimer': _DISCLAIMER_TEXT,
+        })
+
+
+# Section rules for _format_text
+_RULE_EQ = "=" * 80
+_RULE_DASH = "-" * 80
+
+# Static HTML shell for _format_html; dynamic pieces are joined in between
+_HTML_PARTS = (
+    """
+    <div class="omniquant-explanation">
+        <h1>OmniQuant Opportunity Explanation</h1>
+        
+        <section class="summary">
+            <h2>Summary</h2>
+            <p>""",
+    """</p>
+        </section>
+        
+        <section class="metrics">
+            <h2>Key Metrics</h2>
+            <table>
+                """,
+    """
+            </table>
+        </section>
+        
+        <section class="analysis">
+            <h2>Detailed Analysis</h2>
+            <pre>""",
+    """</pre>
+        </section>
+        
+        <section class="risk">
+            <h2>Risk Assessment</h2>
+            <pre>""",
+    """</pre>
+        </section>
         
-        return explanation
+        <section class="recommendation">
+            <h2>Recommendation</h2>
+            <pre>""",
+    """</pre>
+        </section>
+        
+        <footer class="disclaimer">
+            <p><strong>""",
+    """</strong></p>
+        </footer>
+    </div>
+    """
+)
 
 
 def format_for_display(explanation: Explanation, format_type: str = "text") -> str:
@@ -310,56 +381,41 @@ def format_for_display(explanation: Explanation, format_type: str = "text") -> s
         format_type: 'text', 'markdown', or 'html'
     
     Returns:
-        Formatted string
+        Formatted string (memoized per explanation and format type)
     """
+    # Renders per format_type; a plain attribute, not a dataclass field
+    cache = explanation.__dict__.get('_rendered')
+    if cache is None:
+        cache = {}
+        object.__setattr__(explanation, '_rendered', cache)
+    
+    rendered = cache.get(format_type)
+    if rendered is not None:
+        return rendered
+    
     if format_type == "markdown":
-        return _format_markdown(explanation)
+        rendered = _format_markdown(explanation)
     elif format_type == "html":
-        return _format_html(explanation)
+        rendered = _format_html(explanation)
     else:
-        return _format_text(explanation)
+        rendered = _format_text(explanation)
+    
+    cache[format_type] = rendered
+    return rendered
 
 
 def _format_text(exp: Explanation) -> str:
     """Plain text format"""
-    parts = [
-        "=" * 80,
-        "OMNIQUANT OPPORTUNITY EXPLANATION",
-        "=" * 80,
-        "",
-        exp.summary,
-        "",
-        "-" * 80,
-        "KEY METRICS",
-        "-" * 80,
-    ]
-    
-    for key, value in exp.key_metrics.items():
-        parts.append(f"{key:.<30} {value}")
-    
-    parts.extend([
-        "",
-        "-" * 80,
-        "DETAILED ANALYSIS",
-        "-" * 80,
-        exp.detailed_analysis,
-        "",
-        "-" * 80,
-        "RISK ASSESSMENT",
-        "-" * 80,
-        exp.risk_summary,
-        "",
-        "-" * 80,
-        "RECOMMENDATION",
-        "-" * 80,
-        exp.recommendation,
-        "",
-        "=" * 80,
-        exp.disclaimer,
-        "=" * 80
-    ])
-    
-    return "\n".join(parts)
+    metrics_block = "".join([f"\n{key:.<30} {value}" for key, value in exp.key_metrics.items()])
+    return (
+        f"{_RULE_EQ}\nOMNIQUANT OPPORTUNITY EXPLANATION\n{_RULE_EQ}\n\n"
+        f"{exp.summary}\n\n"
+        f"{_RULE_DASH}\nKEY METRICS\n{_RULE_DASH}{metrics_block}\n\n"
+        f"{_RULE_DASH}\nDETAILED ANALYSIS\n{_RULE_DASH}\n{exp.detailed_analysis}\n\n"
+        f"{_RULE_DASH}\nRISK ASSESSMENT\n{_RULE_DASH}\n{exp.risk_summary}\n\n"
+        f"{_RULE_DASH}\nRECOMMENDATION\n{_RULE_DASH}\n{exp.recommendation}\n\n"
+        f"{_RULE_EQ}\n{exp.disclaimer}\n{_RULE_EQ}"
+    )
 
 
 def _format_markdown(exp: Explanation) -> str:
@@ -371,8 +427,7 @@ def _format_markdown(exp: Explanation) -> str:
         "## Key Metrics\n",
     ]
     
-    for key, value in exp.key_metrics.items():
-        parts.append(f"- **{key}**: {value}")
+    parts.extend([f"- **{key}**: {value}" for key, value in exp.key_metrics.items()])
     
     parts.extend([
         "\n## Detailed Analysis\n",
@@ -390,39 +445,13 @@ def _format_markdown(exp: Explanation) -> str:
 
 def _format_html(exp: Explanation) -> str:
     """HTML format"""
-    return f"""
-    <div class="omniquant-explanation">
-        <h1>OmniQuant Opportunity Explanation</h1>
-        
-        <section class="summary">
-            <h2>Summary</h2>
-            <p>{exp.summary}</p>
-        </section>
-        
-        <section class="metrics">
-            <h2>Key Metrics</h2>
-            <table>
-                {"".join(f"<tr><td><strong>{k}</strong></td><td>{v}</td></tr>" for k, v in exp.key_metrics.items())}
-            </table>
-        </section>
-        
-        <section class="analysis">
-            <h2>Detailed Analysis</h2>
-            <pre>{exp.detailed_analysis}</pre>
-        </section>
-        
-        <section class="risk">
-            <h2>Risk Assessment</h2>
-            <pre>{exp.risk_summary}</pre>
-        </section>
-        
-        <section class="recommendation">
-            <h2>Recommendation</h2>
-            <pre>{exp.recommendation}</pre>
-        </section>
-        
-        <footer class="disclaimer">
-            <p><strong>{exp.disclaimer}</strong></p>
-        </footer>
-    </div>
-    """
+    rows = [f"<tr><td><strong>{k}</strong></td><td>{v}</td></tr>" for k, v in exp.key_metrics.items()]
+    return "".join((
+        _HTML_PARTS[0], exp.summary,
+        _HTML_PARTS[1], *rows,
+        _HTML_PARTS[2], exp.detailed_analysis,
+        _HTML_PARTS[3], exp.risk_summary,
+        _HTML_PARTS[4], exp.recommendation,
+        _HTML_PARTS[5], exp.disclaimer,
+        _HTML_PARTS[6]
+    ))
@@ -3,15 +3,24 @@ OmniQuant v2 FastAPI Backend
 Main API server integrating all components
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, Field, ValidationError
+from typing import Annotated, List, Dict, Any, Optional
+from dataclasses import dataclass
 import uvicorn
 import numpy as np
+import asyncio
 import time
+import math
 import os
+import hashlib
+import heapq
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 
 # Try to load environment variables (optional)
 try:
@@ -33,6 +42,10 @@ DEBUG = os.getenv('DEBUG', 'false').lower() == 'true'
 PORT = int(os.getenv('PORT', 8000))
 CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*').split(',')
 USE_REAL_DATA = os.getenv('USE_REAL_DATA', 'false').lower() == 'true'
+ENHANCE_CONCURRENCY = int(os.getenv('ENHANCE_CONCURRENCY', 8))  # Parallel enhancements per scan
+ENHANCE_PROCESSES = int(os.getenv('ENHANCE_PROCESSES', 0))  # Enhancement worker processes (0 = threads)
+RISK_CACHE_SIZE = int(os.getenv('RISK_CACHE_SIZE', 256))  # Cached risk assessments without Monte Carlo
+MAX_MC_SIMULATIONS = int(os.getenv('MAX_MC_SIMULATIONS', 10000))  # Most Monte Carlo runs one scan may request
 
 from simulation.order_book import OrderBookSimulator
 from simulation.slippage_model import AdvancedSlippageModel
@@ -43,6 +56,7 @@ from risk.stress_test import StressTestEngine
 from analytics.persistence_tracker import PersistenceTracker
 from analytics.regime_detector import AdvancedRegimeDetector
 from optimizer.capital_allocator import CapitalAllocator, OpportunityRanker
+from api.cycle_search import search_cycles, scc_labels, MAX_CYCLES_LIMIT, warm_up, NUMBA_AVAILABLE, LOG_MIN_PROFIT, PRUNE_SLACK
 
 # Try to import C++ module (will work after build)
 try:
@@ -51,10 +65,36 @@ try:
 except ImportError:
     CPP_AVAILABLE = False
     print("[WARN] C++ module not available. Using Python fallback.")
+    if not NUMBA_AVAILABLE:
+        print("[WARN] Numba not available. Python fallback scanner runs interpreted.")
+
+# Try to use orjson for response serialization (falls back to stdlib json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    print("[WARN] orjson not available. Using standard JSON responses.")
+
+
+if ORJSON_AVAILABLE:
+    class DefaultResponse(JSONResponse):
+        """JSON response rendered by orjson (handles NumPy scalars and arrays)"""
+        def render(self, content: Any) -> bytes:
+            return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+else:
+    DefaultResponse = JSONResponse
+
+# Try to use msgspec for decoding scan requests (falls back to Pydantic)
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
 
 # Try to import real market data fetcher
 try:
-    from api.real_market_data import RealMarketDataFetcher
+    from api.real_market_data import RealMarketDataFetcher, DEFAULT_SYMBOLS
     REAL_DATA_AVAILABLE = True
     print("[OK] Real-time market data fetcher available")
 except ImportError:
@@ -80,10 +120,51 @@ class MarketPair(BaseModel):
 class ScanRequest(BaseModel):
     """Request to scan for arbitrage"""
     market_data: List[MarketPair]
-    capital: float = 1000.0
-    max_cycles: int = 10
+    capital: float = Field(1000.0, gt=0)
+    max_cycles: int = Field(10, ge=0, le=MAX_CYCLES_LIMIT)
     run_monte_carlo: bool = True
-    mc_simulations: int = 100  # Reduced from 500 for faster scanning
+    mc_simulations: int = Field(100, ge=1, le=MAX_MC_SIMULATIONS)  # Reduced from 500 for faster scanning
+
+
+def _scan_request_schema() -> Dict[str, Any]:
+    """ScanRequest JSON schema with MarketPair inlined (for OpenAPI docs)"""
+    schema = ScanRequest.model_json_schema()
+    defs = schema.pop('$defs', {})
+    schema['properties']['market_data']['items'] = defs['MarketPair']
+    return schema
+
+
+if MSGSPEC_AVAILABLE:
+    class MarketPairStruct(msgspec.Struct):
+        """MarketPair decoded directly from JSON by msgspec"""
+        from_token: str
+        to_token: str
+        rate: float
+        fee: float = 0.001
+        liquidity: float = 10000.0
+        exchange: str = "simulated"
+        volatility: float = 0.01
+
+    class ScanRequestStruct(msgspec.Struct):
+        """ScanRequest decoded directly from JSON by msgspec"""
+        market_data: List[MarketPairStruct]
+        capital: Annotated[float, msgspec.Meta(gt=0)] = 1000.0
+        max_cycles: Annotated[int, msgspec.Meta(ge=0, le=MAX_CYCLES_LIMIT)] = 10
+        run_monte_carlo: bool = True
+        mc_simulations: Annotated[int, msgspec.Meta(ge=1, le=MAX_MC_SIMULATIONS)] = 100
+
+    _decode_scan_request = msgspec.json.Decoder(ScanRequestStruct, strict=False).decode
+    _SCAN_DECODE_ERRORS = (msgspec.DecodeError,)
+    
+    # Lightweight records for scan requests built server-side
+    _MarketPairRecord = MarketPairStruct
+    _ScanRequestRecord = ScanRequestStruct
+else:
+    _decode_scan_request = ScanRequest.model_validate_json
+    _SCAN_DECODE_ERRORS = (ValidationError,)
+    
+    _MarketPairRecord = MarketPair
+    _ScanRequestRecord = ScanRequest
 
 
 class OpportunityResponse(BaseModel):
@@ -114,12 +195,24 @@ class AllocationRequest(BaseModel):
 # FastAPI App
 # ============================================================================
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Compile the cycle search kernel before the first scan needs it"""
+    # Deliberately on the loop (main) thread: Numba's parallel threading
+    # layer must start there, and no requests are served until startup ends
+    if NUMBA_AVAILABLE and not CPP_AVAILABLE:
+        warm_up()
+    yield
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="OmniQuant v2",
     description="Quantitative Market Inefficiency Research Platform",
     version="2.0.0",
     docs_url="/docs" if DEBUG else None,  # Disable docs in production
-    redoc_url="/redoc" if DEBUG else None
+    redoc_url="/redoc" if DEBUG else None,
+    default_response_class=DefaultResponse
 )
 
 # CORS middleware - configure based on environment
@@ -147,8 +240,20 @@ class ApplicationState:
         self.persistence_tracker = PersistenceTracker()
         self.regime_detector = AdvancedRegimeDetector()
         
-        # Cached opportunities
-        self.opportunities: Dict[str, Dict[str, Any]] = {}
+        # Cached opportunities (LRU-bounded, oldest first)
+        self.opportunities: Dict[str, Dict[str, Any]] = OrderedDict()
+        self.MAX_CACHED_OPPORTUNITIES = 10_000
+        
+        # Enhancement results by path signature (LRU-bounded, oldest first)
+        self.enhance_cache: Dict[tuple, Dict[str, Any]] = OrderedDict()
+        self.MAX_ENHANCE_CACHE = 4096
+        
+        # Per-hop parameter tuples by path length (shared, never mutated)
+        self.param_cache: Dict[int, tuple] = {}
+        self.param_summary_cache: Dict[int, tuple] = {}
+        
+        # Enhancement worker processes (created on first use)
+        self._process_pool: Optional[ProcessPoolExecutor] = None
         self.last_scan_time: float = 0.0
         self.scan_count: int = 0
         
@@ -163,6 +268,93 @@ class ApplicationState:
         self.cached_real_market_data = None
         self.cached_data_timestamp = 0.0
         self.CACHE_DURATION = 10.0  # Increased to 10s to ensure consistent view across devices
+        
+        # Background refresh of the shared real data (started on first use,
+        # stops after REAL_DATA_IDLE_TIMEOUT seconds without real-data requests);
+        # it streams every symbol requested since it started
+        self.real_data_lock = asyncio.Lock()
+        self.real_data_refresh_task: Optional[asyncio.Task] = None
+        self.real_data_symbols: List[str] = []
+        self.real_data_requested_at = 0.0
+        self.REAL_DATA_IDLE_TIMEOUT = self.CACHE_DURATION * 6
+        
+        # Cached opportunities expire this long after they were last stored
+        self.OPPORTUNITY_TTL = self.CACHE_DURATION * 60
+        self._opportunity_cached_at: Dict[str, float] = {}
+        
+        # Scan responses by input digest: (stored_at, result), oldest first
+        self.scan_result_cache: Dict[bytes, tuple] = OrderedDict()
+        self.MAX_CACHED_SCANS = 64
+    
+    def request_real_data(self, symbols: Optional[List[str]]):
+        """Note a real-data request and add its symbols (None = defaults) to the refresh"""
+        self.real_data_requested_at = time.time()
+        for symbol in symbols or DEFAULT_SYMBOLS:
+            if symbol not in self.real_data_symbols:
+                self.real_data_symbols.append(symbol)
+    
+    def real_data_idle(self) -> bool:
+        """Whether no real data was requested for REAL_DATA_IDLE_TIMEOUT seconds"""
+        return time.time() - self.real_data_requested_at >= self.REAL_DATA_IDLE_TIMEOUT
+    
+    def cache_opportunity(self, opportunity: Dict[str, Any]):
+        """Cache an opportunity, evicting the least recently stored beyond the limit"""
+        opp_id = opportunity['id']
+        self.opportunities[opp_id] = opportunity
+        self.opportunities.move_to_end(opp_id)
+        self._opportunity_cached_at[opp_id] = time.time()
+        if len(self.opportunities) > self.MAX_CACHED_OPPORTUNITIES:
+            evicted_id, _ = self.opportunities.popitem(last=False)
+            del self._opportunity_cached_at[evicted_id]
+        self.evict_expired_opportunities()
+    
+    def evict_expired_opportunities(self):
+        """Drop cached opportunities older than OPPORTUNITY_TTL (oldest are first)"""
+        cutoff = time.time() - self.OPPORTUNITY_TTL
+        while self.opportunities:
+            oldest_id = next(iter(self.opportunities))
+            if self._opportunity_cached_at[oldest_id] >= cutoff:
+                break
+            self.opportunities.popitem(last=False)
+            del self._opportunity_cached_at[oldest_id]
+    
+    def process_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Worker pool for enhancement, or None when ENHANCE_PROCESSES is 0"""
+        if self._process_pool is None and ENHANCE_PROCESSES > 0:
+            self._process_pool = ProcessPoolExecutor(max_workers=ENHANCE_PROCESSES)
+        return self._process_pool
+    
+    def cached_scan_result(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """Scan response for identical inputs within CACHE_DURATION, if any"""
+        entry = self.scan_result_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.time() - stored_at >= self.CACHE_DURATION:
+            del self.scan_result_cache[key]
+            return None
+        return dict(result)
+    
+    def store_scan_result(self, key: bytes, result: Dict[str, Any]):
+        """Remember a scan response, evicting the oldest beyond the limit"""
+        self.scan_result_cache[key] = (time.time(), dict(result))
+        self.scan_result_cache.move_to_end(key)
+        if len(self.scan_result_cache) > self.MAX_CACHED_SCANS:
+            self.scan_result_cache.popitem(last=False)
+    
+    def cached_enhancement(self, key: tuple) -> Optional[Dict[str, Any]]:
+        """Look up the analysis fields computed for an equivalent opportunity"""
+        fields = self.enhance_cache.get(key)
+        if fields is not None:
+            self.enhance_cache.move_to_end(key)
+        return fields
+    
+    def store_enhancement(self, key: tuple, fields: Dict[str, Any]):
+        """Remember analysis fields, evicting the least recently used beyond the limit"""
+        self.enhance_cache[key] = fields
+        self.enhance_cache.move_to_end(key)
+        if len(self.enhance_cache) > self.MAX_ENHANCE_CACHE:
+            self.enhance_cache.popitem(last=False)
 
 state = ApplicationState()
 
@@ -196,7 +388,10 @@ async def health_check():
 
 
 @app.post("/quick_scan", response_model=Dict[str, Any])
-async def quick_scan(use_real_data: bool = False, symbols: Optional[List[str]] = None, quick_mode: bool = False):
+async def quick_scan(background: BackgroundTasks,
+                     use_real_data: bool = False,
+                     symbols: Optional[List[str]] = None,
+                     quick_mode: bool = False):
     """
     Quick scan endpoint that generates market data internally
     
@@ -213,26 +408,22 @@ async def quick_scan(use_real_data: bool = False, symbols: Optional[List[str]] =
     try:
         # Generate or fetch market data
         if use_real_data and REAL_DATA_AVAILABLE:
-            current_time = time.time()
+            state.request_real_data(symbols)
             
-            # Check global data cache first - crucial for cross-device consistency
-            if state.cached_real_market_data and (current_time - state.cached_data_timestamp < state.CACHE_DURATION):
-                # Use shared cached data if fresh enough (< 5s old)
+            # Check global data cache first - crucial for cross-device consistency.
+            # It is kept fresh by the background refresh; only fetch inline when
+            # there is no data yet or it is older than CACHE_DURATION.
+            data_age = time.time() - state.cached_data_timestamp
+            if state.cached_real_market_data and data_age < state.CACHE_DURATION:
                 # This ensures ALL users see the EXACT SAME data at the same time
                 raw_data = state.cached_real_market_data
                 data_source = "Real Exchanges (Cached Shared)"
             else:
                 print("\n[FETCH] Fetching REAL market data from exchanges...")
-                # Reuse cached fetcher instance (much faster!)
-                if state.real_data_fetcher is None:
-                    print("   Initializing exchange connections (first time only)...")
-                    state.real_data_fetcher = RealMarketDataFetcher()
-                raw_data = state.real_data_fetcher.fetch_real_prices(symbols)
-                
-                # Update global cache
-                state.cached_real_market_data = raw_data
-                state.cached_data_timestamp = current_time
+                raw_data = await _refresh_real_market_data(symbols)
                 data_source = "Real Exchanges (Live)"
+            
+            _ensure_real_data_refresh()
         elif use_real_data and not REAL_DATA_AVAILABLE:
             return {
                 "success": False,
@@ -246,9 +437,9 @@ async def quick_scan(use_real_data: bool = False, symbols: Optional[List[str]] =
         
         print(f"[OK] Loaded {len(raw_data)} trading pairs from {data_source}")
         
-        # Convert to MarketPair format
+        # Convert to MarketPair format (msgspec records when available)
         market_data = [
-            MarketPair(
+            _MarketPairRecord(
                 from_token=pair['from'],
                 to_token=pair['to'],
                 rate=pair['rate'],
@@ -261,16 +452,16 @@ async def quick_scan(use_real_data: bool = False, symbols: Optional[List[str]] =
         ]
         
         # Create scan request with optimized settings
-        scan_request = ScanRequest(
+        scan_request = _ScanRequestRecord(
             market_data=market_data,
             capital=1000.0,
             max_cycles=10,
             run_monte_carlo=not quick_mode,  # Skip Monte Carlo in quick mode
-            mc_simulations=50 if not quick_mode else 0  # Even fewer simulations
+            mc_simulations=50  # Even fewer simulations
         )
         
         # Perform scan
-        result = await scan_arbitrage(scan_request)
+        result = await scan_arbitrage(scan_request, background)
         
         # Add data source info
         result['data_source'] = data_source
@@ -285,12 +476,78 @@ async def quick_scan(use_real_data: bool = False, symbols: Optional[List[str]] =
         raise HTTPException(status_code=500, detail=f"Quick scan failed: {str(e)}")
 
 
+async def _refresh_real_market_data(symbols: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Fetch real prices in a worker thread and update the shared cache"""
+    async with state.real_data_lock:
+        # Another request may have refreshed while we waited
+        if state.cached_real_market_data and time.time() - state.cached_data_timestamp < state.CACHE_DURATION:
+            return state.cached_real_market_data
+        
+        # Reuse cached fetcher instance (much faster!)
+        if state.real_data_fetcher is None:
+            print("   Initializing exchange connections (first time only)...")
+            state.real_data_fetcher = await asyncio.to_thread(RealMarketDataFetcher)
+        raw_data = await asyncio.to_thread(state.real_data_fetcher.fetch_real_prices, symbols)
+        
+        # Update global cache
+        state.cached_real_market_data = raw_data
+        state.cached_data_timestamp = time.time()
+        return raw_data
+
+
+async def _real_data_refresh_loop():
+    """
+    Keep the shared real market data fresh while it is being requested
+    
+    Prices are streamed (pushed over WebSockets where ccxt.pro supports the
+    exchange, polled every CACHE_DURATION otherwise) for every symbol
+    requested so far; the stream restarts only when a new symbol is added.
+    """
+    while not state.real_data_idle():
+        symbols = list(state.real_data_symbols)
+        try:
+            if state.real_data_fetcher is None:
+                state.real_data_fetcher = await asyncio.to_thread(RealMarketDataFetcher)
+            stream = state.real_data_fetcher.stream_prices(symbols, poll_interval=state.CACHE_DURATION)
+            next_data = None
+            try:
+                while not state.real_data_idle() and state.real_data_symbols == symbols:
+                    # Bounded waits, so a stalled stream cannot outlive the idle timeout
+                    if next_data is None:
+                        next_data = asyncio.ensure_future(stream.__anext__())
+                    done, _ = await asyncio.wait({next_data}, timeout=state.CACHE_DURATION)
+                    if not done:
+                        continue
+                    raw_data = next_data.result()
+                    next_data = None
+                    state.cached_real_market_data = raw_data
+                    state.cached_data_timestamp = time.time()
+            finally:
+                # Cancelling a pending read closes the stream's connections
+                if next_data is not None:
+                    next_data.cancel()
+                    await asyncio.gather(next_data, return_exceptions=True)
+                await stream.aclose()
+        except Exception as e:
+            print(f"[WARN] Background market data refresh failed: {e}")
+            await asyncio.sleep(state.CACHE_DURATION)
+    
+    # The next refresh starts from the symbols requested after it
+    state.real_data_symbols = []
+
+
+def _ensure_real_data_refresh():
+    """Start the background refresh loop if it is not already running"""
+    task = state.real_data_refresh_task
+    if task is None or task.done():
+        state.real_data_refresh_task = asyncio.create_task(_real_data_refresh_loop())
+
+
 def _generate_simulated_market_data() -> List[Dict[str, Any]]:
     """Generate simulated market data - deterministic within same 10-second window"""
-    import random
     # Seed based on 10-second window so all devices get same data in same window
     time_window = int(time.time() / 10)
-    random.seed(time_window)
+    rng = np.random.default_rng(time_window)
     
     # Base exchange rates (realistic starting points)
     base_rates = {
@@ -309,110 +566,218 @@ def _generate_simulated_market_data() -> List[Dict[str, Any]]:
     base_rates[('SOL', 'ETH')] = base_rates[('SOL', 'USDT')] / base_rates[('ETH', 'USDT')]
     
     exchanges = ['Binance_SIM', 'Coinbase_SIM', 'Kraken_SIM', 'KuCoin_SIM']
-    pairs = []
-    
-    for (from_token, to_token), base_rate in base_rates.items():
-        for exchange in exchanges:
-            # Add noise to create price differences (potential arbitrage)
-            noise = random.uniform(-0.005, 0.005)  # ±0.5%
-            rate = base_rate * (1 + noise)
-            
-            # Occasionally create bigger inefficiencies for demo
-            if random.random() < 0.1:  # 10% chance
-                rate *= (1 + random.uniform(0.001, 0.003))  # Extra 0.1-0.3%
-            
-            pairs.append({
-                'from': from_token,
-                'to': to_token,
-                'rate': rate,
-                'fee': random.uniform(0.0005, 0.002),  # 0.05% - 0.2%
-                'liquidity': random.uniform(10000, 100000),
-                'exchange': exchange,
-                'volatility': random.uniform(0.005, 0.02),  # 0.5% - 2%
-                'is_real': False
-            })
-            
-            # Add reverse pair
-            pairs.append({
-                'from': to_token,
-                'to': from_token,
-                'rate': 1 / rate if rate > 0 else 0,
-                'fee': random.uniform(0.0005, 0.002),
-                'liquidity': random.uniform(10000, 100000),
-                'exchange': exchange,
-                'volatility': random.uniform(0.005, 0.02),
-                'is_real': False
-            })
-    
-    return pairs
-
-
-@app.post("/scan", response_model=Dict[str, Any])
-async def scan_arbitrage(request: ScanRequest):
+    token_pairs = list(base_rates)
+    shape = (len(token_pairs), len(exchanges))
+    
+    # Add noise to create price differences (potential arbitrage)
+    base = np.fromiter(base_rates.values(), dtype=np.float64, count=len(token_pairs))
+    rates = base[:, None] * (1 + rng.uniform(-0.005, 0.005, shape))  # ±0.5%
+    
+    # Occasionally create bigger inefficiencies for demo
+    extra = rng.random(shape) < 0.1  # 10% chance
+    rates *= np.where(extra, 1 + rng.uniform(0.001, 0.003, shape), 1.0)  # Extra 0.1-0.3%
+    
+    # Forward (index 0) and reverse (index 1) pair parameters
+    with np.errstate(divide='ignore'):
+        reverse_rates = np.where(rates > 0, 1 / rates, 0.0)
+    rate_cols = np.stack([rates, reverse_rates], axis=-1).tolist()
+    fees = rng.uniform(0.0005, 0.002, shape + (2,)).tolist()  # 0.05% - 0.2%
+    liquidity = rng.uniform(10000, 100000, shape + (2,)).tolist()
+    volatility = rng.uniform(0.005, 0.02, shape + (2,)).tolist()  # 0.5% - 2%
+    
+    return [
+        {
+            'from': token_pairs[i][d],
+            'to': token_pairs[i][1 - d],
+            'rate': rate_cols[i][j][d],
+            'fee': fees[i][j][d],
+            'liquidity': liquidity[i][j][d],
+            'exchange': exchange,
+            'volatility': volatility[i][j][d],
+            'is_real': False
+        }
+        for i in range(len(token_pairs))
+        for j, exchange in enumerate(exchanges)
+        for d in (0, 1)
+    ]
+
+
+@app.post(
+    "/scan",
+    response_model=Dict[str, Any],
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": _scan_request_schema()}},
+            "required": True
+        }
+    }
+)
+async def scan_endpoint(http_request: Request, background: BackgroundTasks):
     """
     Main arbitrage detection endpoint
     
+    The body is decoded straight from JSON (msgspec when available);
+    ScanRequest documents the schema.
+    """
+    body = await http_request.body()
+    try:
+        request = _decode_scan_request(body)
+    except _SCAN_DECODE_ERRORS as e:
+        raise HTTPException(status_code=422, detail=f"Invalid scan request: {e}")
+    
+    return await scan_arbitrage(request, background)
+
+
+async def scan_arbitrage(request: ScanRequest, background: Optional[BackgroundTasks] = None):
+    """
+    Run an arbitrage scan
+    
+    Args:
+        request: Scan parameters and market data
+        background: If given, persistence tracking runs after the response is sent
+    
     Returns detected opportunities with full risk analysis
     """
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     try:
+        # Columnar view of the market data, built once per scan
+        market = _market_columns(request.market_data)
+        
+        # Identical inputs within the cache window get the same response
+        cache_key = _scan_cache_key(request, market)
+        cached = state.cached_scan_result(cache_key)
+        if cached is not None:
+            # Still a detection: track it and count it like a fresh scan
+            cached["timestamp"], cached["detection_time_ms"] = await _record_scan(
+                cached["opportunities"], market, background, start_time
+            )
+            return cached
+        
         # Build graph from market data
         opportunities = []
         
+        # Detection runs in a worker thread (the C++ engine and the compiled
+        # kernel release the GIL) so the event loop keeps serving requests
         if CPP_AVAILABLE:
             # Use C++ engine
-            opportunities = _scan_with_cpp(request)
+            opportunities = await asyncio.to_thread(_scan_with_cpp, request, market)
         else:
             # Python fallback (simplified)
-            opportunities = _scan_with_python_fallback(request)
+            opportunities = await asyncio.to_thread(_scan_with_python_fallback, request, market)
         
-        # Enhance with simulations and risk analysis
-        enhanced_opportunities = []
-        for opp in opportunities:
-            enhanced = await _enhance_opportunity(opp, request)
-            enhanced_opportunities.append(enhanced)
-            
-            # Cache opportunity
-            state.opportunities[enhanced['id']] = enhanced
+        # Reuse analysis of equivalent opportunities; group the rest by signature
+        enhanced_opportunities: List[Optional[Dict[str, Any]]] = [None] * len(opportunities)
+        pending: Dict[tuple, List[int]] = {}
+        for i, opp in enumerate(opportunities):
+            key = _enhance_key(opp, request)
+            cached = state.cached_enhancement(key)
+            if cached is not None:
+                enhanced_opportunities[i] = {**opp, **cached}
+            else:
+                pending.setdefault(key, []).append(i)
         
-        # Track persistence
-        for opp in enhanced_opportunities:
-            state.persistence_tracker.track_opportunity(
-                path=opp['path'],
-                return_pct=opp['expected_return'],
-                risk_score=opp['risk_score'],
-                confidence=opp['confidence'],
-                liquidity=sum(p.liquidity for p in request.market_data)
+        if pending:
+            to_enhance = [opportunities[indices[0]] for indices in pending.values()]
+            
+            # Monte Carlo for every new opportunity in one batched simulation
+            mc_batch = [None] * len(to_enhance)
+            if request.run_monte_carlo:
+                mc_batch = await asyncio.to_thread(_simulate_monte_carlo_batch, to_enhance, request)
+            
+            # Enhance with risk analysis (concurrently, bounded)
+            semaphore = asyncio.Semaphore(ENHANCE_CONCURRENCY)
+            
+            async def _enhance_bounded(opp: Dict[str, Any], mc_results) -> Dict[str, Any]:
+                async with semaphore:
+                    return await _enhance_opportunity(opp, request, mc_results)
+            
+            results = await asyncio.gather(
+                *[_enhance_bounded(opp, mc_results) for opp, mc_results in zip(to_enhance, mc_batch)]
             )
+            
+            for (key, indices), opp, enhanced in zip(pending.items(), to_enhance, results):
+                fields = {k: v for k, v in enhanced.items() if k not in opp}
+                state.store_enhancement(key, fields)
+                enhanced_opportunities[indices[0]] = enhanced
+                for i in indices[1:]:
+                    enhanced_opportunities[i] = {**opportunities[i], **fields}
         
-        # Update state
-        state.last_scan_time = time.time()
-        state.scan_count += 1
-        detection_time_ms = (time.time() - start_time) * 1000
-        state.total_detection_time_ms += detection_time_ms
-        state.total_cycles_found += len(enhanced_opportunities)
+        # Cache, track and count the scan
+        timestamp, detection_time_ms = await _record_scan(enhanced_opportunities, market, background, start_time)
         
         # Rank opportunities
         ranked = OpportunityRanker.rank_by_composite(enhanced_opportunities)
         
-        return {
+        result = {
             "success": True,
-            "timestamp": state.last_scan_time,
+            "timestamp": timestamp,
             "detection_time_ms": detection_time_ms,
             "opportunities_found": len(enhanced_opportunities),
             "opportunities": ranked,
             "best_opportunity": ranked[0] if ranked else None,
             "disclaimer": "[WARN] All results are theoretical. No trades executed."
         }
+        state.store_scan_result(cache_key, result)
+        return result
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scan failed: {str(e)}")
 
 
+async def _record_scan(opportunities: List[Dict[str, Any]],
+                       market: "MarketColumns",
+                       background: Optional[BackgroundTasks],
+                       start_time: float) -> tuple:
+    """
+    Cache and track a scan's opportunities and update the scan counters
+    
+    Returns:
+        (scan timestamp, detection time in ms)
+    """
+    # Cache opportunities
+    for opp in opportunities:
+        state.cache_opportunity(opp)
+    
+    # Track persistence (total liquidity is the same for every opportunity)
+    total_liquidity = float(market.liquidity.sum())
+    if background is not None:
+        background.add_task(_track_all, opportunities, total_liquidity, state.persistence_tracker)
+    else:
+        await _track_all(opportunities, total_liquidity, state.persistence_tracker)
+    
+    # Update state
+    state.last_scan_time = time.time()
+    state.scan_count += 1
+    detection_time_ms = (time.perf_counter() - start_time) * 1000
+    state.total_detection_time_ms += detection_time_ms
+    state.total_cycles_found += len(opportunities)
+    return state.last_scan_time, detection_time_ms
+
+
+async def _track_all(opportunities: List[Dict[str, Any]],
+                     total_liquidity: float,
+                     tracker: PersistenceTracker):
+    """
+    Record scanned opportunities in the persistence tracker
+    
+    Async on purpose: background tasks then run on the event loop rather
+    than in a worker thread, so tracker access is never concurrent.
+    """
+    for opp in opportunities:
+        tracker.track_opportunity(
+            path=opp['path'],
+            return_pct=opp['expected_return'],
+            risk_score=opp['risk_score'],
+            confidence=opp['confidence'],
+            liquidity=total_liquidity
+        )
+
+
 @app.get("/opportunities", response_model=Dict[str, Any])
 async def get_opportunities():
     """Get all cached opportunities"""
+    state.evict_expired_opportunities()
     active = state.persistence_tracker.get_active_opportunities()
     
     return {
@@ -427,6 +792,7 @@ async def get_opportunities():
 @app.get("/opportunities/{opportunity_id}", response_model=Dict[str, Any])
 async def get_opportunity(opportunity_id: str):
     """Get specific opportunity details"""
+    state.evict_expired_opportunities()
     if opportunity_id not in state.opportunities:
         raise HTTPException(status_code=404, detail="Opportunity not found")
     
@@ -526,6 +892,41 @@ async def get_metrics():
     }
 
 
+@app.get("/admin/cache_stats", response_model=Dict[str, Any])
+async def get_cache_stats():
+    """Sizes and limits of the in-memory caches"""
+    state.evict_expired_opportunities()
+    risk_info = _risk_without_monte_carlo.cache_info()
+
+    return {
+        "success": True,
+        "caches": {
+            "opportunities": {
+                "size": len(state.opportunities),
+                "max_size": state.MAX_CACHED_OPPORTUNITIES,
+                "ttl_seconds": state.OPPORTUNITY_TTL
+            },
+            "enhancements": {
+                "size": len(state.enhance_cache),
+                "max_size": state.MAX_ENHANCE_CACHE
+            },
+            "scan_results": {
+                "size": len(state.scan_result_cache),
+                "max_size": state.MAX_CACHED_SCANS,
+                "ttl_seconds": state.CACHE_DURATION
+            },
+            # Per process: with ENHANCE_PROCESSES the workers hold their own
+            "risk_assessments": {
+                "size": risk_info.currsize,
+                "max_size": risk_info.maxsize,
+                "hits": risk_info.hits,
+                "misses": risk_info.misses
+            }
+        },
+        "timestamp": time.time()
+    }
+
+
 class MarketImpactRequest(BaseModel):
     """Request for market impact calculation"""
     volume: float = Field(description="Trade volume", gt=0)
@@ -842,30 +1243,90 @@ async def analyze_latency_sensitivity(request: LatencyAnalysisRequest):
 # Helper Functions
 # ============================================================================
 
-def _scan_with_cpp(request: ScanRequest) -> List[Dict[str, Any]]:
+@dataclass
+class MarketColumns:
+    """Struct-of-arrays view of a scan's market pairs"""
+    tokens: List[str]          # Sorted, so ids follow name order
+    exchanges: List[str]       # In order of first appearance
+    from_idx: np.ndarray       # int64 token ids
+    to_idx: np.ndarray
+    exchange_idx: np.ndarray   # int64 exchange ids
+    rates: np.ndarray          # float64 columns
+    fees: np.ndarray
+    liquidity: np.ndarray
+    volatility: np.ndarray
+
+
+def _market_columns(market_data: List[MarketPair]) -> MarketColumns:
+    """Convert market pairs into integer-indexed NumPy columns"""
+    tokens = sorted({p.from_token for p in market_data} | {p.to_token for p in market_data})
+    token_idx = {token: i for i, token in enumerate(tokens)}
+    exchange_idx: Dict[str, int] = {}
+    n = len(market_data)
+    
+    return MarketColumns(
+        tokens=tokens,
+        from_idx=np.fromiter((token_idx[p.from_token] for p in market_data), dtype=np.int64, count=n),
+        to_idx=np.fromiter((token_idx[p.to_token] for p in market_data), dtype=np.int64, count=n),
+        exchange_idx=np.fromiter(
+            (exchange_idx.setdefault(p.exchange, len(exchange_idx)) for p in market_data),
+            dtype=np.int64, count=n
+        ),
+        exchanges=list(exchange_idx),
+        rates=np.fromiter((p.rate for p in market_data), dtype=np.float64, count=n),
+        fees=np.fromiter((p.fee for p in market_data), dtype=np.float64, count=n),
+        liquidity=np.fromiter((p.liquidity for p in market_data), dtype=np.float64, count=n),
+        volatility=np.fromiter((p.volatility for p in market_data), dtype=np.float64, count=n)
+    )
+
+
+def _scan_cache_key(request: ScanRequest, market: MarketColumns) -> bytes:
+    """Digest of everything that determines a scan's response"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update('\x00'.join(market.tokens).encode())
+    digest.update(b'\x01')
+    digest.update('\x00'.join(market.exchanges).encode())
+    for column in (market.from_idx, market.to_idx, market.exchange_idx,
+                   market.rates, market.fees, market.liquidity, market.volatility):
+        digest.update(column.tobytes())
+    digest.update(repr((request.capital, request.max_cycles,
+                        request.run_monte_carlo, request.mc_simulations)).encode())
+    return digest.digest()
+
+
+def _scan_with_cpp(request: ScanRequest, market: MarketColumns) -> List[Dict[str, Any]]:
     """Scan using C++ engine"""
     graph = omniquant_cpp.Graph()
     
-    # Build graph
-    for pair in request.market_data:
-        graph.add_edge(
-            pair.from_token,
-            pair.to_token,
-            pair.rate,
-            pair.fee,
-            pair.liquidity,
-            pair.exchange
-        )
+    # Build graph in one call from the columnar market data
+    graph.add_edges(
+        market.tokens,
+        market.exchanges,
+        market.from_idx,
+        market.to_idx,
+        market.rates,
+        market.fees,
+        market.liquidity,
+        market.exchange_idx
+    )
     
-    # Detect cycles
+    # Detect cycles one strongly connected component at a time; edges
+    # between components cannot lie on a cycle
     detector = omniquant_cpp.CycleDetector()
-    cycles = detector.detect_arbitrage(graph, request.max_cycles)
+    cycles = []
+    for component in graph.strongly_connected_components():
+        if len(cycles) >= request.max_cycles:
+            break
+        cycles.extend(detector.detect_arbitrage_in_scc(
+            graph, component, request.max_cycles - len(cycles)
+        ))
     
     # Convert to dict format
     opportunities = []
+    id_prefix = f"opp_{int(time.time() * 1000)}_"
     for i, cycle in enumerate(cycles):
         opportunities.append({
-            'id': f"opp_{int(time.time()*1000)}_{i}",
+            'id': id_prefix + str(i),
             'path': cycle.path,
             'raw_profit': cycle.raw_profit,
             'expected_return': cycle.raw_profit,
@@ -876,31 +1337,16 @@ def _scan_with_cpp(request: ScanRequest) -> List[Dict[str, Any]]:
     return opportunities
 
 
-def _scan_with_python_fallback(request: ScanRequest) -> List[Dict[str, Any]]:
+def _scan_with_python_fallback(request: ScanRequest, market: MarketColumns) -> List[Dict[str, Any]]:
     """
     Real graph-based arbitrage detection.
     Builds a directed graph from actual market data and finds profitable cycles
     using DFS. Results are DETERMINISTIC - same prices = same results on every device.
     """
-    from collections import defaultdict
+    scan_start = time.perf_counter()
     
-    scan_start = time.time()
-    
-    # Step 1: Build adjacency graph from the actual market data
-    graph = defaultdict(list)
-    tokens = set()
-    
-    for pair in request.market_data:
-        graph[pair.from_token].append((
-            pair.to_token,
-            pair.rate,
-            pair.fee,
-            pair.exchange
-        ))
-        tokens.add(pair.from_token)
-        tokens.add(pair.to_token)
-    
-    token_list = sorted(tokens)  # Sorted for deterministic ordering
+    # Step 1: Graph nodes are the sorted tokens of the market data
+    token_list = market.tokens  # Sorted for deterministic ordering
     
     if not token_list or not request.market_data:
         return []
@@ -910,72 +1356,25 @@ def _scan_with_python_fallback(request: ScanRequest) -> List[Dict[str, Any]]:
     # Step 2: Find all profitable cycles via DFS
     # For each edge A->B with rate r and fee f, effective multiplier = r * (1 - f)
     # A cycle is profitable if product of multipliers > 1.0
-    opportunities = []
-    seen_paths = set()
-    
-    def find_cycles_from(start, max_depth=5):
-        results = []
-        stack = [(start, [start], 1.0, [])]
-        
-        while stack and len(results) < request.max_cycles:
-            current, path, multiplier, exchanges = stack.pop()
-            
-            for (next_token, rate, fee, exchange) in graph[current]:
-                if rate <= 0:
-                    continue
-                
-                new_mult = multiplier * rate * (1 - fee)
-                new_path = path + [next_token]
-                new_exch = exchanges + [exchange]
-                
-                # Check if we completed a cycle back to start
-                if next_token == start and len(path) >= 3:
-                    raw_profit = new_mult - 1.0
-                    if raw_profit > -0.005:  # Show opportunities down to -0.5% (near-profitable)
-                        # Normalize cycle for dedup
-                        cycle_tokens = tuple(new_path[:-1])
-                        min_idx = cycle_tokens.index(min(cycle_tokens))
-                        normalized = cycle_tokens[min_idx:] + cycle_tokens[:min_idx]
-                        exch_key = tuple(sorted(set(new_exch)))
-                        dedup_key = (normalized, exch_key)
-                        
-                        if dedup_key not in seen_paths:
-                            seen_paths.add(dedup_key)
-                            results.append({
-                                'path': new_path,
-                                'multiplier': new_mult,
-                                'raw_profit': raw_profit,
-                                'exchanges': new_exch
-                            })
-                
-                # Continue DFS if not too deep and not revisiting
-                elif next_token != start and next_token not in path and len(path) < max_depth:
-                    stack.append((next_token, new_path, new_mult, new_exch))
-        
-        return results
+    if NUMBA_AVAILABLE:
+        cycles = _find_cycles_compiled(request, market)
+    else:
+        cycles = _find_cycles_interpreted(request, market)
     
-    # Search from every token (sorted = deterministic order)
-    for token in token_list:
-        if len(opportunities) >= request.max_cycles:
-            break
-        cycles = find_cycles_from(token, max_depth=5)
-        for cycle in cycles:
-            if len(opportunities) >= request.max_cycles:
-                break
-            detection_time = (time.time() - scan_start) * 1000
-            opportunities.append({
-                'id': f"opp_{int(time.time()*1000)}_{len(opportunities)}",
-                'path': cycle['path'],
-                'raw_profit': round(cycle['raw_profit'], 8),
-                'expected_return': round(cycle['raw_profit'] * 0.95, 8),  # 5% slippage estimate
-                'path_length': len(cycle['path']) - 1,
-                'detection_time_ms': round(detection_time, 2),
-                'is_profitable': cycle['raw_profit'] > 0
-            })
-    
-    # Sort by profit descending (deterministic)
-    opportunities.sort(key=lambda x: -x['raw_profit'])
-    opportunities = opportunities[:request.max_cycles]
+    opportunities = []
+    id_prefix = f"opp_{int(time.time() * 1000)}_"
+    detection_time = (time.perf_counter() - scan_start) * 1000
+    # Cycles come back as the top max_cycles by log sum, i.e. by raw profit
+    for i, cycle in enumerate(cycles):
+        opportunities.append({
+            'id': id_prefix + str(i),
+            'path': cycle['path'],
+            'raw_profit': round(cycle['raw_profit'], 8),
+            'expected_return': round(cycle['raw_profit'] * 0.95, 8),  # 5% slippage estimate
+            'path_length': len(cycle['path']) - 1,
+            'detection_time_ms': round(detection_time, 2),
+            'is_profitable': cycle['raw_profit'] > 0
+        })
     
     print(f"  Found {len(opportunities)} arbitrage opportunities")
     if opportunities:
@@ -990,42 +1389,326 @@ def _scan_with_python_fallback(request: ScanRequest) -> List[Dict[str, Any]]:
     return opportunities
 
 
-async def _enhance_opportunity(opp: Dict[str, Any], request: ScanRequest) -> Dict[str, Any]:
-    """Enhance opportunity with simulations and risk analysis"""
+def _csr_layout(market: MarketColumns):
+    """
+    CSR row offsets, the edge order that groups edges by source token, and
+    each edge's log(rate * (1 - fee)) weight in that order
+    """
+    n_tokens = len(market.tokens)
+    
+    # Stable sort keeps insertion order within a token
+    order = np.argsort(market.from_idx, kind='stable')
+    offsets = np.zeros(n_tokens + 1, dtype=np.int64)
+    np.cumsum(np.bincount(market.from_idx, minlength=n_tokens), out=offsets[1:])
+    
+    # Cycles then compound by summing weights; -inf marks untradeable edges
+    rates = market.rates[order]
+    fees = market.fees[order]
+    weights = np.full(len(order), -np.inf)
+    usable = (rates > 0) & (fees < 1)
+    weights[usable] = np.log(rates[usable]) + np.log1p(-fees[usable])
+    return offsets, order, weights
+
+
+def _find_cycles_compiled(request: ScanRequest, market: MarketColumns) -> List[Dict[str, Any]]:
+    """Run the Numba DFS kernel over an integer CSR view of the market graph"""
+    offsets, order, weights = _csr_layout(market)
+    
+    paths, exchanges, lengths, log_sums = search_cycles(
+        offsets,
+        market.to_idx[order],
+        weights,
+        market.exchange_idx[order],
+        request.max_cycles, 5
+    )
+    
+    token_list = market.tokens
+    exchange_names = market.exchanges
+    return [
+        {
+            'path': [token_list[t] for t in paths[k, :length + 1]],
+            'multiplier': math.exp(log_sum),
+            'raw_profit': math.expm1(log_sum),
+            'exchanges': [exchange_names[x] for x in exchanges[k, :length]]
+        }
+        for k, (length, log_sum) in enumerate(zip(lengths.tolist(), log_sums.tolist()))
+    ]
+
+
+def _find_cycles_interpreted(request: ScanRequest, market: MarketColumns) -> List[Dict[str, Any]]:
+    """
+    Interpreted DFS cycle search over the CSR view (used when Numba is unavailable)
+    
+    Mirrors the compiled kernel: each start token only records the cycles it
+    is the smallest id of, and the merged results keep the most profitable.
+    """
+    offsets, order, weights = _csr_layout(market)
+    
+    # Cycles stay within a strongly connected component
+    dst = market.to_idx[order]
+    labels = scc_labels(offsets, dst, weights).tolist()
+    component_size = [0] * (max(labels, default=-1) + 1)
+    for label in labels:
+        component_size[label] += 1
+    
+    # Plain lists: indexing them is far cheaper than NumPy scalar access
+    offsets = offsets.tolist()
+    dst = dst.tolist()
+    weights_list = weights.tolist()
+    exch = market.exchange_idx[order].tolist()
+    token_list = market.tokens
+    exchange_names = market.exchanges
+    
+    n_tokens = len(token_list)
+    max_depth = 5
+    max_cycles = request.max_cycles
+    
+    # Best edge weight leaving each token (-inf for dead ends)
+    node_gain = [max(weights_list[offsets[u]:offsets[u + 1]], default=-math.inf)
+                 for u in range(n_tokens)]
+    max_gain = max(node_gain, default=0.0)
+    
+    # One shared DFS state instead of per-edge path/exchange list copies:
+    # path[d] is the token at depth d, logs[d] the weight sum up to it,
+    # exchs[d] the exchange of the hop into depth d + 1, and pending[d] the
+    # edges still to descend into from depth d (taken from the end, as the
+    # original stack-based search did). codes[d] packs path[:d + 1] as
+    # base-(n_tokens + 1) digits and masks[d] has a bit per exchange used to
+    # reach depth d, so a cycle's dedup key is a single exact integer.
+    path = [0] * max_depth
+    logs = [0.0] * max_depth
+    exchs = [0] * max_depth
+    codes = [0] * max_depth
+    masks = [0] * max_depth
+    base = n_tokens + 1
+    n_exchanges = len(exchange_names)
+    pending: List[List[int]] = [[] for _ in range(max_depth)]
+    in_path = [False] * n_tokens
+    
+    cycles = []
+    cycle_logs = []
+    for start in range(n_tokens):
+        component = labels[start]
+        if component_size[component] < 3:
+            continue
+        
+        seen_paths = set()
+        found = 0
+        depth = 0
+        path[0] = start
+        codes[0] = start + 1
+        in_path[start] = True
+        expand = True
+        
+        while depth >= 0:
+            if expand:
+                # Visit the token at this depth: record closed cycles, queue descents
+                current = path[depth]
+                log_sum = logs[depth]
+                length = depth + 1
+                children = pending[depth]
+                children.clear()
+                
+                # Most the hops after an edge and the one leaving its target can add
+                hops_left = max_depth - length
+                rest = (hops_left - 1) * max_gain if max_gain > 0 else 0.0
+                
+                for e in range(offsets[current], offsets[current + 1]):
+                    weight = weights_list[e]
+                    if weight == -math.inf:
+                        continue
+                    
+                    next_id = dst[e]
+                    
+                    # Check if we completed a cycle back to start
+                    if next_id == start:
+                        if length < 3:
+                            continue
+                        new_log = log_sum + weight
+                        if new_log <= LOG_MIN_PROFIT:  # Near-profitable cycles included
+                            continue
+                        
+                        # Start is the smallest id, so the path is already normalized
+                        dedup_key = (codes[depth] << n_exchanges) | masks[depth] | (1 << exch[e])
+                        
+                        if dedup_key not in seen_paths:
+                            seen_paths.add(dedup_key)
+                            cycle_ids = path[:length]
+                            cycle_ids.append(start)
+                            cycle_exch = exchs[:length - 1]
+                            cycle_exch.append(exch[e])
+                            cycles.append({
+                                'path': [token_list[t] for t in cycle_ids],
+                                'multiplier': math.exp(new_log),
+                                'raw_profit': math.expm1(new_log),
+                                'exchanges': [exchange_names[x] for x in cycle_exch]
+                            })
+                            cycle_logs.append(new_log)
+                            found += 1
+                            if found >= max_cycles:
+                                break
+                    
+                    # Lower ids belong to earlier starts' searches
+                    elif (next_id > start and labels[next_id] == component
+                          and not in_path[next_id] and length < max_depth):
+                        # Skip prefixes that cannot reach the threshold
+                        if log_sum + weight + node_gain[next_id] + rest <= LOG_MIN_PROFIT - PRUNE_SLACK:
+                            continue
+                        children.append(e)
+            
+            children = pending[depth]
+            if children and found < max_cycles:
+                # Descend along the most recently queued edge
+                e = children.pop()
+                exchs[depth] = exch[e]
+                logs[depth + 1] = logs[depth] + weights_list[e]
+                codes[depth + 1] = codes[depth] * base + dst[e] + 1
+                masks[depth + 1] = masks[depth] | (1 << exch[e])
+                depth += 1
+                path[depth] = dst[e]
+                in_path[dst[e]] = True
+                expand = True
+            else:
+                # Backtrack
+                in_path[path[depth]] = False
+                depth -= 1
+                expand = False
+    
+    # Keep the most profitable (ties stay in discovery order)
+    ranked = heapq.nlargest(max_cycles, range(len(cycles)), key=cycle_logs.__getitem__)
+    return [cycles[k] for k in ranked]
+
+
+def _enhance_key(opp: Dict[str, Any], request: ScanRequest) -> tuple:
+    """Signature of the inputs that determine an opportunity's analysis"""
+    return (
+        tuple(opp['path']),
+        round(opp['expected_return'], 6),
+        opp['path_length'],
+        request.capital,
+        request.run_monte_carlo,
+        request.mc_simulations
+    )
+
+
+def _hop_parameters(path_length: int):
+    """Per-hop (liquidities, volatilities, fees, spreads) for an opportunity"""
+    params = state.param_cache.get(path_length)
+    if params is None:
+        params = state.param_cache.setdefault(path_length, (
+            (1000.0,) * path_length,
+            (0.01,) * path_length,
+            (0.001,) * path_length,
+            (10.0,) * path_length
+        ))
+    return params
+
+
+def _hop_summary(path_length: int):
+    """(total liquidity, mean volatility) over an opportunity's hops"""
+    summary = state.param_summary_cache.get(path_length)
+    if summary is None:
+        liquidities, volatilities, _, _ = _hop_parameters(path_length)
+        summary = state.param_summary_cache.setdefault(
+            path_length, (float(sum(liquidities)), float(np.mean(volatilities)))
+        )
+    return summary
+
+
+def _assess_risk(path_length: int, capital: float, mc_results=None):
+    """Risk assessment of an opportunity (shared per length and capital without Monte Carlo)"""
+    if mc_results is None:
+        return _risk_without_monte_carlo(path_length, capital)
+    
+    liquidities, volatilities, _, spreads = _hop_parameters(path_length)
+    return state.risk_engine.assess_risk(
+        capital=capital,
+        liquidities=liquidities,
+        volatilities=volatilities,
+        path_length=path_length,
+        spreads=spreads,
+        latency_half_life_ms=50.0,
+        monte_carlo_results=mc_results
+    )
+
+
+# lru_cache keeps its bookkeeping thread-safe for the concurrent enhancements
+@lru_cache(maxsize=RISK_CACHE_SIZE)
+def _risk_without_monte_carlo(path_length: int, capital: float):
+    """Risk assessment without Monte Carlo input, which depends on nothing else"""
+    liquidities, volatilities, _, spreads = _hop_parameters(path_length)
+    return state.risk_engine.assess_risk(
+        capital=capital,
+        liquidities=liquidities,
+        volatilities=volatilities,
+        path_length=path_length,
+        spreads=spreads,
+        latency_half_life_ms=50.0
+    )
+
+
+def _simulate_monte_carlo_batch(opportunities: List[Dict[str, Any]], request: ScanRequest) -> List[Any]:
+    """Run Monte Carlo for all opportunities of a scan in one vectorized call"""
+    path_lengths = np.array([opp['path_length'] for opp in opportunities])
+    max_hops = int(path_lengths.max())
+    liquidities, volatilities, fees, _ = _hop_parameters(max_hops)
+    n_opps = len(opportunities)
+    
+    mc = MonteCarloSimulator(n_simulations=request.mc_simulations)
+    return mc.simulate_batch(
+        base_returns=np.array([opp['expected_return'] for opp in opportunities]),
+        liquidities=np.tile(liquidities, (n_opps, 1)),
+        volatilities=np.tile(volatilities, (n_opps, 1)),
+        base_fees=np.tile(fees, (n_opps, 1)),
+        capital=request.capital,
+        path_lengths=path_lengths
+    )
+
+
+async def _enhance_opportunity(opp: Dict[str, Any], request: ScanRequest, mc_results=None) -> Dict[str, Any]:
+    """Enhance opportunity in a worker process (or thread) so the event loop stays free"""
+    # Only the scalar settings are sent, not the request's market data
+    args = (opp, request.capital, request.run_monte_carlo, request.mc_simulations, mc_results)
+    pool = state.process_pool()
+    if pool is not None:
+        return await asyncio.get_running_loop().run_in_executor(pool, _enhance_opportunity_sync, *args)
+    return await asyncio.to_thread(_enhance_opportunity_sync, *args)
+
+
+def _enhance_opportunity_sync(opp: Dict[str, Any],
+                              capital: float,
+                              run_monte_carlo: bool,
+                              mc_simulations: int,
+                              mc_results=None) -> Dict[str, Any]:
+    """
+    Enhance opportunity with risk analysis
+    
+    mc_results comes from the scan's batched Monte Carlo run; when it is
+    missing and Monte Carlo is enabled, a single simulation is run here.
+    Uses only module-level engines, so it can run in a worker process.
+    """
     
     # Extract parameters
     path_length = opp['path_length']
     base_return = opp['expected_return']
     
     # Gather liquidities and volatilities
-    liquidities = [1000.0] * path_length
-    volatilities = [0.01] * path_length
-    fees = [0.001] * path_length
-    spreads = [10.0] * path_length
+    liquidities, volatilities, fees, _ = _hop_parameters(path_length)
     
     # Monte Carlo simulation
-    mc_results = None
-    if request.run_monte_carlo:
-        mc = MonteCarloSimulator(n_simulations=request.mc_simulations)
+    if mc_results is None and run_monte_carlo:
+        mc = MonteCarloSimulator(n_simulations=mc_simulations)
         mc_results = mc.simulate_opportunity(
             base_return=base_return,
             path_length=path_length,
             liquidities=liquidities,
             volatilities=volatilities,
             base_fees=fees,
-            capital=request.capital
+            capital=capital
         )
     
     # Risk assessment
-    risk_assessment = state.risk_engine.assess_risk(
-        capital=request.capital,
-        liquidities=liquidities,
-        volatilities=volatilities,
-        path_length=path_length,
-        spreads=spreads,
-        latency_half_life_ms=50.0,
-        monte_carlo_results=mc_results
-    )
+    risk_assessment = _assess_risk(path_length, capital, mc_results)
     
     # Stress test
     stress_report = state.stress_test_engine.run_stress_tests({
@@ -1037,15 +1720,16 @@ async def _enhance_opportunity(opp: Dict[str, Any], request: ScanRequest) -> Dic
     })
     
     # Build enhanced opportunity
+    total_liquidity, mean_volatility = _hop_summary(path_length)
     enhanced = {
         **opp,
         'risk_score': risk_assessment.composite_score,
         'risk_level': risk_assessment.risk_level.value,
         'confidence': risk_assessment.confidence,
-        'warnings': risk_assessment.warnings,
-        'recommendations': risk_assessment.recommendations,
-        'liquidity': sum(liquidities),
-        'volatility': np.mean(volatilities)
+        'warnings': list(risk_assessment.warnings),
+        'recommendations': list(risk_assessment.recommendations),
+        'liquidity': total_liquidity,
+        'volatility': mean_volatility
     }
     
     if mc_results:
@@ -5,11 +5,30 @@ NO AI/ML REQUIRED - Just HTTP API calls
 """
 
 import ccxt
+import logging
+import sys
 import time
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
 
+# WebSocket ticker streams (optional - stream_prices polls REST without it)
+try:
+    import ccxt.pro as ccxtpro
+    CCXT_PRO_AVAILABLE = True
+except ImportError:
+    CCXT_PRO_AVAILABLE = False
+
+# Include cross-pairs for more arbitrage cycle detection
+DEFAULT_SYMBOLS = [
+    'BTC/USDT', 'ETH/USDT', 'BNB/USDT', 'SOL/USDT',
+    'ETH/BTC', 'SOL/ETH'
+]
+
+# Per-ticker progress and errors (DEBUG/WARNING); summaries are printed
+logger = logging.getLogger(__name__)
+
 
 class RealMarketDataFetcher:
     """
@@ -29,6 +48,7 @@ class RealMarketDataFetcher:
         # Initialize exchanges (NO API KEYS NEEDED for public data)
         # Reduced timeout to 5s for faster response
         self.exchanges = {}
+        self.enable_rate_limit = enable_rate_limit
         
         try:
             self.exchanges['binance'] = ccxt.binance({
@@ -69,8 +89,43 @@ class RealMarketDataFetcher:
         if not self.exchanges:
             raise Exception("Could not connect to any exchanges")
         
+        # Last exchange status check: (monotonic time, status)
+        self._status_cache = (0.0, {})
+        self.STATUS_CACHE_TTL = 30.0  # seconds
+        
+        # Most tickers turned into pairs per fetch (first exchanges first)
+        self.MAX_PRICES = 20  # Allow more prices for cross-pairs
+        
         print(f"[OK] Connected to {len(self.exchanges)} exchanges\n")
     
+    def _fetch_exchange_tickers(self, exchange_name: str, exchange, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Fetch tickers for several symbols from one exchange
+        
+        Uses a single bulk request when the exchange supports it, otherwise
+        (or if the bulk request fails) one request per symbol.
+        
+        Returns:
+            Dictionary mapping symbols to ccxt tickers (failed symbols omitted)
+        """
+        if exchange.has.get('fetchTickers'):
+            try:
+                return exchange.fetch_tickers(symbols)
+            except Exception as e:
+                logger.warning("Bulk fetch failed on %s, fetching per symbol: %.50s", exchange_name, e)
+        
+        tickers = {}
+        for symbol in symbols:
+            try:
+                tickers[symbol] = exchange.fetch_ticker(symbol)
+            except ccxt.RequestTimeout as e:  # Before NetworkError, its base class
+                logger.warning("Timeout %s from %s: %.50s", symbol, exchange_name, e)
+            except ccxt.NetworkError as e:
+                logger.warning("Network error %s from %s: %.50s", symbol, exchange_name, e)
+            except Exception as e:
+                logger.warning("Error %s from %s: %.50s", symbol, exchange_name, e)
+        return tickers
+    
     def fetch_real_prices(self, symbols: Optional[List[str]] = None) -> List[Dict]:
         """
         Fetch REAL market prices from live exchanges
@@ -83,37 +138,72 @@ class RealMarketDataFetcher:
             List of dictionaries containing real trading pair data
         """
         if symbols is None:
-            # Include cross-pairs for more arbitrage cycle detection
-            symbols = [
-                'BTC/USDT', 'ETH/USDT', 'BNB/USDT', 'SOL/USDT',
-                'ETH/BTC', 'SOL/ETH'
-            ]
+            symbols = DEFAULT_SYMBOLS
         
         print(f"[FETCH] Fetching real-time prices for {len(symbols)} pairs from {len(self.exchanges)} exchanges...")
         
+        # One (bulk) ticker request per exchange, all exchanges in parallel
+        with ThreadPoolExecutor(max_workers=len(self.exchanges)) as pool:
+            futures = {
+                exchange_name: pool.submit(self._fetch_exchange_tickers, exchange_name, exchange, symbols)
+                for exchange_name, exchange in self.exchanges.items()
+            }
+            tickers_by_exchange = {name: future.result() for name, future in futures.items()}
+        
+        pairs, fetch_count = self._pairs_from_tickers(tickers_by_exchange, symbols)
+        if fetch_count >= self.MAX_PRICES:
+            print(f"  [SPEED] Speed limit: stopping at {fetch_count} fetches")
+        
+        print(f"[OK] Fetched {fetch_count} real prices from {len(self.exchanges)} exchanges "
+              f"({len(pairs)} trading pairs including reverse pairs)")
+        
+        return pairs
+    
+    def _pairs_from_tickers(self, tickers_by_exchange: Dict[str, Dict[str, Dict]],
+                            symbols: List[str]) -> Tuple[List[Dict], int]:
+        """
+        Turn ccxt tickers into forward and reverse trading pairs
+        
+        At most MAX_PRICES tickers are used, in exchange then symbol order.
+        
+        Returns:
+            (pairs, number of tickers used)
+        """
         pairs = []
         fetch_count = 0
-        max_fetches = 20  # Allow more fetches for cross-pairs
+        max_fetches = self.MAX_PRICES
+        now_ms = int(time.time() * 1000)  # For tickers without a timestamp
         
-        for exchange_name, exchange in self.exchanges.items():
+        # Split each symbol once for all exchanges; interned token names make
+        # the token dict lookups downstream identity hits
+        symbol_tokens = {symbol: tuple(map(sys.intern, symbol.split('/'))) for symbol in symbols}
+        
+        for exchange_name, tickers in tickers_by_exchange.items():
             for symbol in symbols:
                 if fetch_count >= max_fetches:
-                    print(f"  [SPEED] Speed limit: stopping at {fetch_count} fetches")
                     break
                     
                 try:
-                    # Fetch REAL ticker data from exchange with timeout
-                    ticker = exchange.fetch_ticker(symbol)
+                    ticker = tickers.get(symbol)
                     
                     if not ticker or 'last' not in ticker or ticker['last'] is None:
                         continue
                     
-                    from_token, to_token = symbol.split('/')
+                    from_token, to_token = symbol_tokens[symbol]
+                    
+                    # Read each ticker field once
+                    bid = ticker.get('bid')
+                    ask = ticker.get('ask')
+                    quote_volume = ticker.get('quoteVolume')
+                    base_volume = ticker.get('baseVolume')
+                    timestamp = ticker.get('timestamp', now_ms)
                     
                     # Calculate rates for arbitrage detection
                     last_price = float(ticker['last'])
-                    bid_price = float(ticker['bid']) if ticker.get('bid') else last_price
-                    ask_price = float(ticker['ask']) if ticker.get('ask') else last_price
+                    bid_price = float(bid) if bid else last_price
+                    ask_price = float(ask) if ask else last_price
+                    quote_volume = float(quote_volume) if quote_volume else 0
+                    base_volume = float(base_volume) if base_volume else 0
                     
                     # Forward pair (e.g., BTC -> USDT)
                     pairs.append({
@@ -123,54 +213,127 @@ class RealMarketDataFetcher:
                         'bid': bid_price,
                         'ask': ask_price,
                         'last': last_price,
-                        'volume': float(ticker.get('quoteVolume', 0)) if ticker.get('quoteVolume') else 0,
+                        'volume': quote_volume,
                         'fee': 0.0005,  # 0.05% maker fee (realistic for high-volume traders)
-                        'liquidity': float(ticker.get('quoteVolume', 0)) * 0.01 if ticker.get('quoteVolume') else 10000,
+                        'liquidity': quote_volume * 0.01 if quote_volume else 10000,
                         'exchange': exchange_name,
-                        'timestamp': ticker.get('timestamp', int(time.time() * 1000)),
+                        'timestamp': timestamp,
                         'symbol': symbol,
                         'is_real': True,
                         'volatility': 0.015  # Typical crypto volatility
                     })
                     
                     # Reverse pair (e.g., USDT -> BTC)
+                    inverse_last = 1 / last_price if last_price > 0 else 0
                     pairs.append({
                         'from': to_token,
                         'to': from_token,
-                        'rate': 1 / last_price if last_price > 0 else 0,
+                        'rate': inverse_last,
                         'bid': 1 / ask_price if ask_price > 0 else 0,
                         'ask': 1 / bid_price if bid_price > 0 else 0,
-                        'last': 1 / last_price if last_price > 0 else 0,
-                        'volume': float(ticker.get('baseVolume', 0)) if ticker.get('baseVolume') else 0,
+                        'last': inverse_last,
+                        'volume': base_volume,
                         'fee': 0.0005,  # 0.05% maker fee
-                        'liquidity': float(ticker.get('baseVolume', 0)) * 0.01 if ticker.get('baseVolume') else 10000,
+                        'liquidity': base_volume * 0.01 if base_volume else 10000,
                         'exchange': exchange_name,
-                        'timestamp': ticker.get('timestamp', int(time.time() * 1000)),
+                        'timestamp': timestamp,
                         'symbol': f"{to_token}/{from_token}",
                         'is_real': True,
                         'volatility': 0.015
                     })
                     
                     fetch_count += 1
-                    print(f"  [OK] {exchange_name:12} {symbol:12} ${last_price:>12,.2f}")
+                    logger.debug("%-12s %-12s $%12.2f", exchange_name, symbol, last_price)
                     
-                except ccxt.NetworkError as e:
-                    print(f"  [WARN] Network error {symbol} from {exchange_name}")
-                    continue
-                except ccxt.RequestTimeout as e:
-                    print(f"  [TIMEOUT] Timeout {symbol} from {exchange_name}")
-                    continue
                 except Exception as e:
-                    print(f"  [WARN] Error {symbol} from {exchange_name}: {str(e)[:50]}")
+                    logger.warning("Error %s from %s: %.50s", symbol, exchange_name, e)
                     continue
             
             if fetch_count >= max_fetches:
                 break
         
-        print(f"\n[OK] Successfully fetched {fetch_count} real prices")
-        print(f"[OK] Generated {len(pairs)} trading pairs (including reverse pairs)\n")
+        return pairs, fetch_count
+    
+    async def stream_prices(self, symbols: Optional[List[str]] = None,
+                            poll_interval: float = 10.0) -> AsyncIterator[List[Dict]]:
+        """
+        Yield fresh trading pairs whenever any exchange reports new tickers
         
-        return pairs
+        Exchanges that support it are watched over a ccxt.pro WebSocket
+        (updates are pushed as they happen); the others, or all of them when
+        ccxt.pro is unavailable, are polled over REST every poll_interval
+        seconds. The first snapshot waits until every exchange has answered
+        once; after that, bursts of updates are coalesced into one snapshot.
+        
+        Args:
+            symbols: List of trading pairs like ['BTC/USDT', 'ETH/USDT']
+                    If None, uses default major pairs
+            poll_interval: Seconds between REST polls of an exchange
+        
+        Yields:
+            Trading pairs in the same format as fetch_real_prices
+        """
+        if symbols is None:
+            symbols = DEFAULT_SYMBOLS
+        
+        latest: Dict[str, Dict[str, Dict]] = {name: {} for name in self.exchanges}
+        not_answered = set(self.exchanges)
+        updated = asyncio.Event()
+        clients = []
+        
+        def report(exchange_name: str, tickers: Dict[str, Dict]):
+            latest[exchange_name].update(tickers)
+            not_answered.discard(exchange_name)
+            if not not_answered:
+                updated.set()
+        
+        async def watch(exchange_name: str, client):
+            while True:
+                try:
+                    tickers = await client.watch_tickers(symbols)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning("Ticker stream error on %s: %.50s", exchange_name, e)
+                    report(exchange_name, {})
+                    await asyncio.sleep(poll_interval)
+                    continue
+                report(exchange_name, tickers)
+        
+        async def poll(exchange_name: str, exchange):
+            while True:
+                report(exchange_name, await asyncio.to_thread(
+                    self._fetch_exchange_tickers, exchange_name, exchange, symbols
+                ))
+                await asyncio.sleep(poll_interval)
+        
+        tasks = []
+        for exchange_name, exchange in self.exchanges.items():
+            client = None
+            if CCXT_PRO_AVAILABLE and hasattr(ccxtpro, exchange_name):
+                client = getattr(ccxtpro, exchange_name)({'enableRateLimit': self.enable_rate_limit})
+                if client.has.get('watchTickers'):
+                    clients.append(client)
+                else:
+                    await client.close()
+                    client = None
+            if client is not None:
+                tasks.append(asyncio.create_task(watch(exchange_name, client)))
+            else:
+                tasks.append(asyncio.create_task(poll(exchange_name, exchange)))
+        
+        try:
+            while True:
+                await updated.wait()
+                updated.clear()
+                pairs, _ = self._pairs_from_tickers(latest, symbols)
+                yield pairs
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for client in clients:
+                await client.close()
     
     def fetch_orderbook(self, exchange_name: str, symbol: str, limit: int = 5) -> Optional[Dict]:
         """
@@ -199,26 +362,43 @@ class RealMarketDataFetcher:
                 'exchange': exchange_name
             }
         except Exception as e:
-            print(f"Could not fetch orderbook for {symbol} from {exchange_name}: {e}")
+            logger.warning("Could not fetch orderbook for %s from %s: %s", symbol, exchange_name, e)
             return None
     
+    def _probe_exchange(self, exchange) -> bool:
+        """Whether an exchange is reachable (status endpoint, else a ticker)"""
+        try:
+            if exchange.has.get('fetchStatus'):
+                return exchange.fetch_status().get('status') == 'ok'
+            # Try to fetch a simple ticker to test connection
+            exchange.fetch_ticker('BTC/USDT')
+            return True
+        except:
+            return False
+    
     def get_exchange_status(self) -> Dict[str, bool]:
         """
         Check which exchanges are currently available
         
+        Exchanges are probed in parallel; the result is reused for
+        STATUS_CACHE_TTL seconds.
+        
         Returns:
             Dictionary mapping exchange names to availability status
         """
-        status = {}
-        for exchange_name, exchange in self.exchanges.items():
-            try:
-                # Try to fetch a simple ticker to test connection
-                exchange.fetch_ticker('BTC/USDT')
-                status[exchange_name] = True
-            except:
-                status[exchange_name] = False
+        checked_at, status = self._status_cache
+        if status and time.monotonic() - checked_at < self.STATUS_CACHE_TTL:
+            return dict(status)
+        
+        with ThreadPoolExecutor(max_workers=len(self.exchanges)) as pool:
+            futures = {
+                exchange_name: pool.submit(self._probe_exchange, exchange)
+                for exchange_name, exchange in self.exchanges.items()
+            }
+            status = {name: future.result() for name, future in futures.items()}
         
-        return status
+        self._status_cache = (time.monotonic(), status)
+        return dict(status)
     
     def fetch_multi_exchange_arbitrage_data(self) -> List[Dict]:
         """
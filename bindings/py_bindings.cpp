@@ -1,6 +1,8 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 #include <pybind11/functional.h>
+#include <pybind11/numpy.h>
+#include <stdexcept>
 #include "../core/graph_engine.h"
 #include "../core/cycle_detector.h"
 #include "../core/edge_pruner.h"
@@ -27,11 +29,50 @@ PYBIND11_MODULE(omniquant_cpp, m) {
         .def(py::init<>())
         .def("add_node", &Graph::add_node)
         .def("add_edge", &Graph::add_edge)
+        .def("add_edges",
+             [](Graph& graph,
+                const std::vector<std::string>& tokens,
+                const std::vector<std::string>& exchanges,
+                py::array_t<int64_t, py::array::c_style | py::array::forcecast> from_ids,
+                py::array_t<int64_t, py::array::c_style | py::array::forcecast> to_ids,
+                py::array_t<double, py::array::c_style | py::array::forcecast> rates,
+                py::array_t<double, py::array::c_style | py::array::forcecast> fees,
+                py::array_t<double, py::array::c_style | py::array::forcecast> liquidities,
+                py::array_t<int64_t, py::array::c_style | py::array::forcecast> exchange_ids) {
+                 const py::ssize_t n = from_ids.size();
+                 if (to_ids.size() != n || rates.size() != n || fees.size() != n ||
+                     liquidities.size() != n || exchange_ids.size() != n) {
+                     throw std::invalid_argument("add_edges: column lengths differ");
+                 }
+                 auto from = from_ids.unchecked<1>();
+                 auto to = to_ids.unchecked<1>();
+                 auto exch = exchange_ids.unchecked<1>();
+                 const auto n_tokens = static_cast<int64_t>(tokens.size());
+                 const auto n_exchanges = static_cast<int64_t>(exchanges.size());
+                 for (py::ssize_t i = 0; i < n; ++i) {
+                     if (from(i) < 0 || from(i) >= n_tokens || to(i) < 0 || to(i) >= n_tokens ||
+                         exch(i) < 0 || exch(i) >= n_exchanges) {
+                         throw std::out_of_range("add_edges: id out of range");
+                     }
+                 }
+                 py::gil_scoped_release release;
+                 graph.add_edges(tokens, exchanges,
+                                 from_ids.data(), to_ids.data(),
+                                 rates.data(), fees.data(), liquidities.data(),
+                                 exchange_ids.data(), static_cast<size_t>(n));
+             },
+             py::arg("tokens"), py::arg("exchanges"),
+             py::arg("from_ids"), py::arg("to_ids"),
+             py::arg("rates"), py::arg("fees"), py::arg("liquidities"),
+             py::arg("exchange_ids"))
         .def("node_count", &Graph::node_count)
         .def("edge_count", &Graph::edge_count)
         .def("get_node_index", &Graph::get_node_index)
         .def("get_node_name", &Graph::get_node_name)
         .def("get_edges", &Graph::get_edges, py::return_value_policy::reference)
+        .def("get_weights", &Graph::get_weights)
+        .def("strongly_connected_components", &Graph::strongly_connected_components,
+             py::call_guard<py::gil_scoped_release>())
         .def("clear", &Graph::clear);
     
     // ArbitrageCycle struct
@@ -56,7 +97,11 @@ PYBIND11_MODULE(omniquant_cpp, m) {
     py::class_<CycleDetector>(m, "CycleDetector")
         .def(py::init<>())
         .def("detect_arbitrage", &CycleDetector::detect_arbitrage, 
-             py::arg("graph"), py::arg("max_cycles") = 10)
+             py::arg("graph"), py::arg("max_cycles") = 10,
+             py::call_guard<py::gil_scoped_release>())
+        .def("detect_arbitrage_in_scc", &CycleDetector::detect_arbitrage_in_scc,
+             py::arg("graph"), py::arg("component"), py::arg("max_cycles") = 10,
+             py::call_guard<py::gil_scoped_release>())
         .def("get_metrics", &CycleDetector::get_metrics);
     
     // PruningConfig struct
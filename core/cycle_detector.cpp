@@ -13,31 +13,88 @@ CycleDetector::CycleDetector() {
 CycleDetector::~CycleDetector() {}
 
 std::vector<ArbitrageCycle> CycleDetector::detect_arbitrage(const Graph& graph, int max_cycles) {
+    std::vector<int> sources(graph.node_count());
+    for (int i = 0; i < graph.node_count(); ++i) sources[i] = i;
+    
+    std::vector<int> edge_ids(graph.edge_count());
+    for (int e = 0; e < graph.edge_count(); ++e) edge_ids[e] = e;
+    
+    return detect_in_subgraph(graph, sources, edge_ids, max_cycles);
+}
+
+std::vector<ArbitrageCycle> CycleDetector::detect_arbitrage_in_scc(const Graph& graph,
+                                                                   const std::vector<int>& component,
+                                                                   int max_cycles) {
+    const auto& edges = graph.get_edges();
+    const auto& adj = graph.get_adjacency_list();
+    
+    // A single node only has a cycle through a self-loop
+    if (component.size() == 1) {
+        int node = component[0];
+        bool self_loop = false;
+        for (int e : adj[node]) {
+            if (edges[e].to == node) {
+                self_loop = true;
+                break;
+            }
+        }
+        if (!self_loop) {
+            metrics_ = DetectionMetrics{1, 0, 0.0, 0};
+            return {};
+        }
+    }
+    
+    std::vector<char> in_component(graph.node_count(), 0);
+    for (int node : component) in_component[node] = 1;
+    
+    std::vector<int> sources(component.begin(), component.end());
+    std::sort(sources.begin(), sources.end());
+    
+    // Keep only edges with both endpoints inside the component, in insertion order
+    std::vector<int> edge_ids;
+    for (int node : sources) {
+        for (int e : adj[node]) {
+            if (in_component[edges[e].to]) edge_ids.push_back(e);
+        }
+    }
+    std::sort(edge_ids.begin(), edge_ids.end());
+    
+    return detect_in_subgraph(graph, sources, edge_ids, max_cycles);
+}
+
+std::vector<ArbitrageCycle> CycleDetector::detect_in_subgraph(const Graph& graph,
+                                                              const std::vector<int>& sources,
+                                                              const std::vector<int>& edge_ids,
+                                                              int max_cycles) {
     auto start_time = std::chrono::high_resolution_clock::now();
     
     std::vector<ArbitrageCycle> cycles;
-    metrics_.graph_nodes = graph.node_count();
-    metrics_.graph_edges = graph.edge_count();
+    metrics_.graph_nodes = static_cast<int>(sources.size());
+    metrics_.graph_edges = static_cast<int>(edge_ids.size());
+    metrics_.detection_time_ms = 0.0;
+    metrics_.cycles_found = 0;
     
-    if (graph.node_count() == 0) {
+    if (sources.empty()) {
         return cycles;
     }
     
     std::unordered_set<std::string> found_cycle_keys;
+    const int rounds = std::max(static_cast<int>(sources.size()) - 1, 1);
+    const auto& edges = graph.get_edges();
+    const auto& weights = graph.get_weights();
+    std::vector<double> dist(graph.node_count());
+    std::vector<int> parent(graph.node_count());
     
     // Try from each node as potential source
-    for (int source = 0; source < graph.node_count() && static_cast<int>(cycles.size()) < max_cycles; ++source) {
-        std::vector<double> dist(graph.node_count());
-        std::vector<int> parent(graph.node_count());
-        
-        if (bellman_ford(graph, source, dist, parent)) {
+    for (size_t s = 0; s < sources.size() && static_cast<int>(cycles.size()) < max_cycles; ++s) {
+        if (bellman_ford(graph, edge_ids, rounds, sources[s], dist, parent)) {
             // Negative cycle detected, extract it
             int cycle_node = -1;
             
             // Find node in negative cycle
-            const auto& edges = graph.get_edges();
-            for (const auto& edge : edges) {
-                if (dist[edge.from] + edge.get_weight() < dist[edge.to]) {
+            for (int e : edge_ids) {
+                const auto& edge = edges[e];
+                if (dist[edge.from] + weights[e] < dist[edge.to]) {
                     cycle_node = edge.to;
                     break;
                 }
@@ -75,11 +132,11 @@ std::vector<ArbitrageCycle> CycleDetector::detect_arbitrage(const Graph& graph,
     return cycles;
 }
 
-bool CycleDetector::bellman_ford(const Graph& graph, int source, 
-                                 std::vector<double>& dist, 
+bool CycleDetector::bellman_ford(const Graph& graph, const std::vector<int>& edge_ids, int rounds,
+                                 int source, std::vector<double>& dist,
                                  std::vector<int>& parent) {
-    int n = graph.node_count();
     const auto& edges = graph.get_edges();
+    const auto& weights = graph.get_weights();
     
     // Initialize distances
     std::fill(dist.begin(), dist.end(), std::numeric_limits<double>::infinity());
@@ -87,10 +144,11 @@ bool CycleDetector::bellman_ford(const Graph& graph, int source,
     dist[source] = 0.0;
     
     // Relax edges |V| - 1 times
-    for (int i = 0; i < n - 1; ++i) {
-        for (const auto& edge : edges) {
+    for (int i = 0; i < rounds; ++i) {
+        for (int e : edge_ids) {
+            const auto& edge = edges[e];
             if (dist[edge.from] != std::numeric_limits<double>::infinity()) {
-                double new_dist = dist[edge.from] + edge.get_weight();
+                double new_dist = dist[edge.from] + weights[e];
                 if (new_dist < dist[edge.to]) {
                     dist[edge.to] = new_dist;
                     parent[edge.to] = edge.from;
@@ -100,9 +158,10 @@ bool CycleDetector::bellman_ford(const Graph& graph, int source,
     }
     
     // Check for negative cycle
-    for (const auto& edge : edges) {
+    for (int e : edge_ids) {
+        const auto& edge = edges[e];
         if (dist[edge.from] != std::numeric_limits<double>::infinity()) {
-            if (dist[edge.from] + edge.get_weight() < dist[edge.to]) {
+            if (dist[edge.from] + weights[e] < dist[edge.to]) {
                 return true;  // Negative cycle exists
             }
         }
@@ -164,7 +223,7 @@ ArbitrageCycle CycleDetector::extract_cycle(const Graph& graph, int cycle_node,
     // Log-space profit (sum of weights should be negative for arbitrage)
     cycle.log_profit = 0.0;
     for (int edge_idx : cycle.edge_indices) {
-        cycle.log_profit += edges[edge_idx].get_weight();
+        cycle.log_profit += graph.get_weights()[edge_idx];
     }
     
     return cycle;
@@ -32,12 +32,25 @@ public:
     // Main detection function using Bellman-Ford
     std::vector<ArbitrageCycle> detect_arbitrage(const Graph& graph, int max_cycles = 10);
     
+    // Detection restricted to one strongly connected component: only its
+    // nodes are used as sources and only edges inside it are relaxed
+    std::vector<ArbitrageCycle> detect_arbitrage_in_scc(const Graph& graph,
+                                                        const std::vector<int>& component,
+                                                        int max_cycles = 10);
+    
     // Get performance metrics
     DetectionMetrics get_metrics() const { return metrics_; }
     
 private:
-    // Bellman-Ford with negative cycle detection
-    bool bellman_ford(const Graph& graph, int source, std::vector<double>& dist, std::vector<int>& parent);
+    // Run detection from each source over the given edge subset
+    std::vector<ArbitrageCycle> detect_in_subgraph(const Graph& graph,
+                                                   const std::vector<int>& sources,
+                                                   const std::vector<int>& edge_ids,
+                                                   int max_cycles);
+    
+    // Bellman-Ford with negative cycle detection over a subset of edges
+    bool bellman_ford(const Graph& graph, const std::vector<int>& edge_ids, int rounds,
+                      int source, std::vector<double>& dist, std::vector<int>& parent);
     
     // Extract cycle from parent array
     ArbitrageCycle extract_cycle(const Graph& graph, int cycle_node, const std::vector<int>& parent);
@@ -1,6 +1,7 @@
 #include "graph_engine.h"
 #include <cmath>
 #include <algorithm>
+#include <utility>
 
 namespace omniquant {
 
@@ -15,6 +16,7 @@ double Edge::get_weight() const {
 Graph::Graph() {
     nodes_.reserve(100);
     edges_.reserve(1000);
+    weights_.reserve(1000);
 }
 
 Graph::~Graph() {
@@ -53,10 +55,50 @@ void Graph::add_edge(const std::string& from_token,
     edge.exchange = exchange;
     
     int edge_idx = static_cast<int>(edges_.size());
+    weights_.push_back(edge.get_weight());
     edges_.push_back(edge);
     adj_list_[from_idx].push_back(edge_idx);
 }
 
+void Graph::add_edges(const std::vector<std::string>& tokens,
+                      const std::vector<std::string>& exchanges,
+                      const int64_t* from_ids,
+                      const int64_t* to_ids,
+                      const double* rates,
+                      const double* fees,
+                      const double* liquidities,
+                      const int64_t* exchange_ids,
+                      size_t count) {
+    // Map caller token ids to node indices lazily to keep insertion order
+    std::vector<int> node_of(tokens.size(), -1);
+    auto node_for = [&](int64_t token_id) {
+        int& idx = node_of[token_id];
+        if (idx < 0) idx = add_node(tokens[token_id]);
+        return idx;
+    };
+    
+    edges_.reserve(edges_.size() + count);
+    weights_.reserve(weights_.size() + count);
+    
+    for (size_t i = 0; i < count; ++i) {
+        int from_idx = node_for(from_ids[i]);
+        int to_idx = node_for(to_ids[i]);
+        
+        Edge edge;
+        edge.from = from_idx;
+        edge.to = to_idx;
+        edge.rate = rates[i];
+        edge.fee = fees[i];
+        edge.liquidity = liquidities[i];
+        edge.exchange = exchanges[exchange_ids[i]];
+        
+        int edge_idx = static_cast<int>(edges_.size());
+        weights_.push_back(edge.get_weight());
+        edges_.push_back(std::move(edge));
+        adj_list_[from_idx].push_back(edge_idx);
+    }
+}
+
 int Graph::get_node_index(const std::string& token) const {
     auto it = node_indices_.find(token);
     if (it == node_indices_.end()) return -1;
@@ -70,10 +112,76 @@ std::string Graph::get_node_name(int index) const {
     return nodes_[index];
 }
 
+std::vector<std::vector<int>> Graph::strongly_connected_components() const {
+    const int n = static_cast<int>(nodes_.size());
+    std::vector<int> index(n, -1);
+    std::vector<int> lowlink(n, 0);
+    std::vector<char> on_stack(n, 0);
+    std::vector<int> scc_stack;
+    std::vector<std::vector<int>> components;
+    int next_index = 0;
+    
+    // Explicit DFS stack of (node, position in its adjacency list)
+    std::vector<std::pair<int, size_t>> call_stack;
+    
+    for (int root = 0; root < n; ++root) {
+        if (index[root] != -1) continue;
+        
+        call_stack.emplace_back(root, 0);
+        index[root] = lowlink[root] = next_index++;
+        scc_stack.push_back(root);
+        on_stack[root] = 1;
+        
+        while (!call_stack.empty()) {
+            int node = call_stack.back().first;
+            size_t& pos = call_stack.back().second;
+            const auto& out = adj_list_[node];
+            
+            if (pos < out.size()) {
+                int next = edges_[out[pos++]].to;
+                if (index[next] == -1) {
+                    index[next] = lowlink[next] = next_index++;
+                    scc_stack.push_back(next);
+                    on_stack[next] = 1;
+                    call_stack.emplace_back(next, 0);
+                } else if (on_stack[next]) {
+                    lowlink[node] = std::min(lowlink[node], index[next]);
+                }
+                continue;
+            }
+            
+            // All successors visited: close the component rooted here
+            if (lowlink[node] == index[node]) {
+                std::vector<int> component;
+                int member;
+                do {
+                    member = scc_stack.back();
+                    scc_stack.pop_back();
+                    on_stack[member] = 0;
+                    component.push_back(member);
+                } while (member != node);
+                std::sort(component.begin(), component.end());
+                components.push_back(std::move(component));
+            }
+            
+            call_stack.pop_back();
+            if (!call_stack.empty()) {
+                int parent = call_stack.back().first;
+                lowlink[parent] = std::min(lowlink[parent], lowlink[node]);
+            }
+        }
+    }
+    
+    std::sort(components.begin(), components.end(),
+              [](const std::vector<int>& a, const std::vector<int>& b) { return a.front() < b.front(); });
+    return components;
+}
+
 void Graph::clear() {
     nodes_.clear();
     node_indices_.clear();
     edges_.clear();
+    weights_.clear();
     adj_list_.clear();
 }
 
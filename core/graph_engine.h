@@ -2,6 +2,8 @@
 #define OMNIQUANT_GRAPH_ENGINE_H
 
 #include <vector>
+#include <cstdint>
+#include <cstddef>
 #include <string>
 #include <unordered_map>
 #include <memory>
@@ -35,6 +37,19 @@ public:
                   double liquidity,
                   const std::string& exchange);
     
+    // Add many edges at once from columnar data. Edge i connects
+    // tokens[from_ids[i]] -> tokens[to_ids[i]] on exchanges[exchange_ids[i]];
+    // nodes are created in order of first appearance, as with add_edge.
+    void add_edges(const std::vector<std::string>& tokens,
+                   const std::vector<std::string>& exchanges,
+                   const int64_t* from_ids,
+                   const int64_t* to_ids,
+                   const double* rates,
+                   const double* fees,
+                   const double* liquidities,
+                   const int64_t* exchange_ids,
+                   size_t count);
+    
     // Get graph properties
     int node_count() const { return nodes_.size(); }
     int edge_count() const { return edges_.size(); }
@@ -45,8 +60,14 @@ public:
     
     // Get edges
     const std::vector<Edge>& get_edges() const { return edges_; }
+    const std::vector<double>& get_weights() const { return weights_; }
     const std::vector<std::vector<int>>& get_adjacency_list() const { return adj_list_; }
     
+    // Strongly connected components (iterative Tarjan). Each component
+    // lists its nodes in ascending order; components are ordered by their
+    // smallest node index.
+    std::vector<std::vector<int>> strongly_connected_components() const;
+    
     // Clear graph
     void clear();
     
@@ -54,6 +75,7 @@ private:
     std::vector<std::string> nodes_;                          // Token names
     std::unordered_map<std::string, int> node_indices_;       // Token -> index
     std::vector<Edge> edges_;                                  // All edges
+    std::vector<double> weights_;                              // Edge weights, computed once on insert
     std::vector<std::vector<int>> adj_list_;                  // Adjacency list (node -> edge indices)
 };
 
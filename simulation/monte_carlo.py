@@ -55,6 +55,9 @@ class MonteCarloSimulator:
         self.n_simulations = n_simulations
         if random_seed is not None:
             np.random.seed(random_seed)
+        
+        # Generator for the batched path (supports float32 draws)
+        self.rng = np.random.default_rng(random_seed)
     
     def simulate_opportunity(self,
                             base_return: float,
@@ -77,20 +80,89 @@ class MonteCarloSimulator:
         Returns:
             MonteCarloResults with statistical summary
         """
-        returns = []
-        
-        for _ in range(self.n_simulations):
-            result = self._run_single_simulation(
-                base_return,
-                path_length,
-                liquidities,
-                volatilities,
-                base_fees,
-                capital
+        # A batch of one: every simulation and hop is drawn in one vectorized pass
+        return self.simulate_batch(
+            np.array([base_return]),
+            [liquidities[:path_length]],
+            [volatilities[:path_length]],
+            [base_fees[:path_length]],
+            capital
+        )[0]
+    
+    def simulate_batch(self,
+                       base_returns: np.ndarray,
+                       liquidities: np.ndarray,
+                       volatilities: np.ndarray,
+                       base_fees: np.ndarray,
+                       capital: float = 1000.0,
+                       path_lengths: Optional[np.ndarray] = None) -> List[MonteCarloResults]:
+        """
+        Run Monte Carlo simulation for many opportunities at once
+        
+        Same model as _run_single_simulation, evaluated as one broadcasted
+        (n_opportunities, n_simulations, path_length) computation per
+        distinct path length. Work buffers are float32; summary statistics
+        are computed in float64.
+        
+        Args:
+            base_returns: Theoretical return per opportunity, shape (N,)
+            liquidities: Liquidity per hop, shape (N, P)
+            volatilities: Volatility per hop, shape (N, P)
+            base_fees: Fees per hop, shape (N, P)
+            capital: Trading capital
+            path_lengths: Hops per opportunity (default: all P); hops
+                beyond an opportunity's length are ignored
+        
+        Returns:
+            One MonteCarloResults per opportunity
+        """
+        f32 = np.float32
+        liquidities = np.asarray(liquidities, dtype=f32)
+        volatilities = np.asarray(volatilities, dtype=f32)
+        base_fees = np.asarray(base_fees, dtype=f32)
+        n_opps, max_hops = liquidities.shape
+        if path_lengths is None:
+            path_lengths = np.full(n_opps, max_hops)
+        path_lengths = np.asarray(path_lengths)
+        
+        # Simulate each path length separately so no hops are padded
+        returns = np.empty((n_opps, self.n_simulations), dtype=np.float64)
+        for hops in np.unique(path_lengths):
+            rows = np.flatnonzero(path_lengths == hops)
+            returns[rows] = self._simulate_returns(
+                liquidities[rows, :hops], volatilities[rows, :hops], base_fees[rows, :hops], capital
             )
-            returns.append(result.final_return)
         
-        return self._aggregate_results(returns)
+        return [self._aggregate_results(row.tolist()) for row in returns]
+    
+    def _simulate_returns(self,
+                          liquidities: np.ndarray,
+                          volatilities: np.ndarray,
+                          base_fees: np.ndarray,
+                          capital: float) -> np.ndarray:
+        """Simulated returns, shape (N, n_simulations), for N paths of equal length"""
+        f32 = np.float32
+        n_opps, hops = liquidities.shape
+        shape = (n_opps, self.n_simulations, hops)
+        rng = self.rng
+        
+        # Randomize latency (per simulation) and liquidity/volatility (per hop)
+        latency_ms = rng.standard_exponential((n_opps, self.n_simulations), dtype=f32) * f32(50)
+        actual_liquidity = liquidities[:, None, :] * (f32(0.7) + f32(0.6) * rng.random(shape, dtype=f32))
+        actual_volatility = volatilities[:, None, :] * (f32(0.5) + rng.random(shape, dtype=f32))
+        
+        # Slippage based on capital and liquidity (capped at 10%)
+        with np.errstate(divide='ignore'):
+            liquidity_ratio = np.where(actual_liquidity > 0, f32(capital) / actual_liquidity, f32(1))
+        slippage = np.minimum(f32(0.01) * liquidity_ratio ** f32(0.6), f32(0.1))
+        
+        # Volatility noise and per-hop multipliers
+        volatility_noise = rng.standard_normal(shape, dtype=f32) * actual_volatility
+        hop_multiplier = (1 - base_fees[:, None, :]) * (1 - slippage) * (1 + volatility_noise)
+        
+        # Compound along the path, then apply latency decay (upcast for the stats)
+        latency_decay = 1 - (latency_ms / f32(100)) * f32(0.001)
+        return (hop_multiplier.prod(axis=2) * latency_decay).astype(np.float64) - 1.0
     
     def _run_single_simulation(self,
                                base_return: float,
@@ -0,0 +1,115 @@
+"""
+Cycle search kernel against a brute-force enumeration of simple cycles
+"""
+
+import math
+import random
+
+import numpy as np
+import pytest
+
+from api.cycle_search import find_cycles, search_cycles, LOG_MIN_PROFIT, MAX_CYCLES_LIMIT
+
+MAX_DEPTH = 5
+
+
+def _random_graph(rng: random.Random):
+    """CSR graph without parallel edges; some edges untradeable (-inf)"""
+    n_tokens = rng.randint(4, 9)
+    edges = {}
+    for _ in range(rng.randint(2 * n_tokens, n_tokens * (n_tokens - 1))):
+        u, v = rng.sample(range(n_tokens), 2)
+        if rng.random() < 0.1:
+            weight = -math.inf
+        else:
+            weight = math.log(rng.uniform(0.98, 1.03)) + math.log1p(-0.001)
+        # Exchange ids past 63 exercise the multi-word exchange bitmask
+        edges[(u, v)] = (weight, rng.randrange(90))
+
+    offsets = np.zeros(n_tokens + 1, dtype=np.int64)
+    dst, weights, exch = [], [], []
+    for u in range(n_tokens):
+        for (a, b), (w, x) in sorted(edges.items()):
+            if a == u:
+                dst.append(b)
+                weights.append(w)
+                exch.append(x)
+        offsets[u + 1] = len(dst)
+    return (offsets, np.array(dst, dtype=np.int64), np.array(weights, dtype=np.float64),
+            np.array(exch, dtype=np.int64))
+
+
+def _brute_force(offsets, dst, weight, exch):
+    """{closed path: (exchanges, log sum)} of every reportable cycle"""
+    found = {}
+
+    def walk(path, exchanges, log_sum):
+        current = path[-1]
+        for e in range(offsets[current], offsets[current + 1]):
+            if weight[e] == -math.inf:
+                continue
+            nxt = int(dst[e])
+            if nxt == path[0]:
+                if len(path) >= 3 and log_sum + weight[e] > LOG_MIN_PROFIT:
+                    found[tuple(path) + (nxt,)] = (tuple(exchanges) + (int(exch[e]),), log_sum + weight[e])
+            elif nxt > path[0] and nxt not in path and len(path) < MAX_DEPTH:
+                walk(path + [nxt], exchanges + [int(exch[e])], log_sum + weight[e])
+
+    for start in range(len(offsets) - 1):
+        walk([start], [], 0.0)
+    return found
+
+
+def _as_dict(result):
+    paths, exchanges, lengths, log_sums = result
+    return {
+        tuple(paths[k, :lengths[k] + 1].tolist()): (tuple(exchanges[k, :lengths[k]].tolist()), log_sums[k])
+        for k in range(len(lengths))
+    }
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_all_cycles_match_brute_force(seed):
+    graph = _random_graph(random.Random(seed))
+    expected = _brute_force(*graph)
+    max_cycles = 2000
+    assert len(expected) < max_cycles
+
+    found = _as_dict(find_cycles(*graph, max_cycles, MAX_DEPTH))
+
+    assert found.keys() == expected.keys()
+    for path, (exchanges, log_sum) in expected.items():
+        assert found[path][0] == exchanges
+        assert found[path][1] == pytest.approx(log_sum, abs=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_bounded_results_are_ranked_reportable_cycles(seed):
+    graph = _random_graph(random.Random(seed))
+    expected = _brute_force(*graph)
+
+    paths, exchanges, lengths, log_sums = result = find_cycles(*graph, 3, MAX_DEPTH)
+
+    assert len(lengths) <= 3
+    assert list(log_sums) == sorted(log_sums, reverse=True)
+    assert _as_dict(result).keys() <= expected.keys()
+
+
+@pytest.mark.parametrize("max_cycles", [0, -1])
+def test_no_cycles_requested_returns_none(max_cycles):
+    graph = _random_graph(random.Random(0))
+
+    for search in (find_cycles, search_cycles):
+        paths, exchanges, lengths, log_sums = search(*graph, max_cycles, MAX_DEPTH)
+        assert paths.shape == (0, MAX_DEPTH + 1)
+        assert len(lengths) == len(log_sums) == 0
+
+
+def test_search_clamps_max_cycles():
+    graph = _random_graph(random.Random(1))
+    expected = _brute_force(*graph)
+
+    found = _as_dict(search_cycles(*graph, 10 ** 12, MAX_DEPTH))
+
+    assert len(found) <= MAX_CYCLES_LIMIT
+    assert found.keys() == expected.keys()
@@ -0,0 +1,85 @@
+"""
+Persistence tracker running statistics against straightforward baselines
+"""
+
+import math
+import random
+import types
+
+import numpy as np
+import pytest
+
+from analytics import persistence_tracker as pt
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for the tracker module"""
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(pt, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def _paths(n):
+    return [[f"T{i}", f"U{i}", f"V{i}", f"T{i}"] for i in range(n)]
+
+
+def test_running_stats_match_numpy_after_eviction(clock):
+    tracker = pt.PersistenceTracker(opportunity_timeout_ms=1000, cleanup_interval=1)
+    rng = random.Random(7)
+    returns = {}  # opportunity id -> returns fed in
+
+    paths = _paths(12)
+    for step in range(300):
+        clock[0] += rng.uniform(0.0, 0.2)
+        # Later steps only revisit part of the paths, so the rest go stale
+        path = rng.choice(paths if step < 150 else paths[:4])
+        value = rng.gauss(0.002, 0.004)
+        opp_id = tracker.track_opportunity(path, value, 40.0, 70.0, 1e5)
+        if tracker.opportunities[opp_id].detection_count == 1:
+            returns[opp_id] = []  # New, or restarted after eviction
+        returns[opp_id].append(value)
+
+    live = [r for opp_id, r in returns.items() if opp_id in tracker.opportunities]
+    assert len(live) < len(returns), "expected some lifecycles to be evicted"
+    all_live = np.concatenate(live)
+
+    assert tracker._n == len(all_live)
+    assert tracker._mean == pytest.approx(np.mean(all_live), rel=1e-9, abs=1e-12)
+    assert math.sqrt(tracker._M2 / tracker._n) == pytest.approx(np.std(all_live), rel=1e-7)
+
+    metrics = tracker.get_persistence_metrics()
+    assert metrics.sharpe_ratio == pytest.approx(np.mean(all_live) / np.std(all_live), rel=1e-6)
+
+
+def test_lifecycle_columns_and_welford_match_inputs(clock):
+    tracker = pt.PersistenceTracker()
+    rng = np.random.default_rng(3)
+    values = rng.normal(0.003, 0.002, size=40)  # Forces several column grows
+
+    timestamps = []
+    for value in values:
+        clock[0] += 0.05
+        timestamps.append(clock[0])
+        opp_id = tracker.track_opportunity(["A", "B", "C", "A"], float(value), 35.0, 80.0, 5e4)
+
+    lifecycle = tracker.get_lifecycle(opp_id)
+    assert lifecycle.detection_count == len(values)
+    assert lifecycle.return_std == pytest.approx(np.std(values), rel=1e-9)
+
+    # float32 scoring columns keep ~7 significant digits; timestamps stay exact
+    snapshots = lifecycle.snapshots
+    assert [s.timestamp for s in snapshots] == timestamps
+    np.testing.assert_allclose([s.return_pct for s in snapshots], values, rtol=1e-6)
+    assert all(s.liquidity == 5e4 for s in snapshots)
+
+
+def test_read_paths_do_not_evict(clock):
+    tracker = pt.PersistenceTracker(opportunity_timeout_ms=1000)
+    for path in _paths(3):
+        tracker.track_opportunity(path, 0.001, 30.0, 90.0, 1e4)
+
+    clock[0] += 60.0
+    assert tracker.get_active_opportunities() == []
+    assert tracker.get_persistence_metrics().total_opportunities == 3
+    assert len(tracker.opportunities) == 3
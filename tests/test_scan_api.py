@@ -0,0 +1,75 @@
+"""
+Scan API: compiled vs interpreted cycle search, and request decoding
+"""
+
+import random
+
+import pytest
+
+pytest.importorskip("uvicorn")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+
+from api import main
+
+
+@pytest.fixture(scope="module")
+def client():
+    # Compile the kernel on this (main) thread before scans run in workers
+    if main.NUMBA_AVAILABLE:
+        main.warm_up()
+    return TestClient(main.app)
+
+
+def _random_market(rng: random.Random):
+    tokens = [f"T{i}" for i in range(rng.randint(3, 9))]
+    exchanges = [f"E{i}" for i in range(rng.randint(1, 5))]
+    pairs = []
+    for _ in range(rng.randint(2, 120)):
+        a, b = rng.sample(tokens, 2)
+        rate = rng.choice([rng.uniform(0.9, 1.1), rng.uniform(0.99, 1.01), 0.0])
+        pairs.append(main.MarketPair(
+            from_token=a, to_token=b, rate=rate,
+            fee=rng.uniform(0, 0.003), exchange=rng.choice(exchanges)
+        ))
+    return pairs
+
+
+@pytest.mark.skipif(not main.NUMBA_AVAILABLE, reason="compiled kernel needs Numba")
+@pytest.mark.parametrize("seed", range(60))
+def test_compiled_matches_interpreted(seed):
+    rng = random.Random(seed)
+    pairs = _random_market(rng)
+    request = main.ScanRequest(market_data=pairs, max_cycles=rng.choice([1, 3, 10, 50]))
+    market = main._market_columns(pairs)
+
+    assert main._find_cycles_compiled(request, market) == main._find_cycles_interpreted(request, market)
+
+
+@pytest.mark.parametrize("body", [
+    b"not json",
+    b"{}",
+    b'{"market_data": [{"from_token": "A"}]}',
+    b'{"market_data": [{"from_token": "A", "to_token": "B", "rate": "fast"}]}',
+    b'{"market_data": "BTC"}',
+    b'{"market_data": [], "max_cycles": -1}',
+    b'{"market_data": [], "max_cycles": 1000000000}',
+    b'{"market_data": [], "mc_simulations": -5}',
+    b'{"market_data": [], "mc_simulations": 0}',
+    b'{"market_data": [], "capital": -100}',
+])
+def test_malformed_scan_body_is_422(client, body):
+    response = client.post("/scan", content=body, headers={"content-type": "application/json"})
+    assert response.status_code == 422
+
+
+def test_valid_scan_body_is_accepted(client):
+    market_data = [
+        {"from_token": "A", "to_token": "B", "rate": 1.01, "exchange": "x"},
+        {"from_token": "B", "to_token": "C", "rate": 1.0, "exchange": "x"},
+        {"from_token": "C", "to_token": "A", "rate": 1.0, "fee": 0, "exchange": "y"},
+    ]
+    response = client.post("/scan", json={"market_data": market_data, "run_monte_carlo": False})
+    assert response.status_code == 200
+    assert response.json()["opportunities"][0]["path"] == ["A", "B", "C", "A"]